@@ -0,0 +1,28 @@
+from quoridor.board import Board
+from quoridor.perft import board_from_state
+from quoridor.constants import BLACK, WHITE
+
+# Fixed positions the benchmarks run on, as Board.serialize states with the side to move:
+# (black square, white square, horizontal walls, vertical walls, black walls left, white walls left)
+# Changing a position makes results incomparable with older baselines, so add new ones instead
+POSITIONS = {
+    # Both pawns one step out, every wall slot still free
+    "opening": (((1, 4), (7, 4), (), (), 10, 10), WHITE),
+    # Twelve walls down and four left each, so walls are still generated and checked
+    "midgame": (((3, 4), (5, 3),
+                 ((1, 0), (5, 2), (5, 7), (7, 3)),
+                 ((1, 6), (2, 5), (2, 7), (5, 2), (5, 4), (7, 4), (7, 6), (8, 3)),
+                 4, 4), WHITE),
+    # All twenty walls placed, a pawn race on a crowded board
+    "endgame": (((6, 2), (2, 6),
+                 ((0, 6), (1, 3), (2, 3), (2, 7), (3, 0), (3, 3), (3, 7), (4, 0), (5, 5), (5, 7), (6, 2), (7, 0),
+                  (7, 5), (7, 7)),
+                 ((1, 2), (1, 3), (6, 7), (7, 4), (7, 8), (8, 2)),
+                 0, 0), BLACK),
+}
+
+
+# A fresh board_class board (Board or BitBoard) set up at the named position, and the color to move
+def load_position(name, board_class=Board):
+    state, color = POSITIONS[name]
+    return board_from_state(state, board_class), color
@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from quoridor.ai import AI
+from quoridor.board import Board
+from quoridor.bitboard import BitBoard
+from quoridor.pathfinding import shortest_path
+from .positions import POSITIONS, load_position
+
+# Throughput of the move generation, path finding, evaluation and search code on the fixed positions in
+# positions.py. Results are saved as JSON and compared with a stored baseline to catch regressions:
+#   python -m benchmarks.run                    run and compare with benchmarks/baseline.json
+#   python -m benchmarks.run --save-baseline    run and make the results the new baseline
+# Timings depend on the machine, so only compare results from the same machine
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+BOARD_CLASSES = {"board": Board, "bitboard": BitBoard}
+
+# AI settings of each search timed, plain alpha-beta and the principal variation search with late move
+# reductions and aspiration windows
+SEARCH_MODES = {
+    "search": {},
+    "pvs_search": {"pvs": True, "late_move_reductions": True, "aspiration_window": 10.0},
+}
+
+
+# Calls func in growing batches until min_time seconds have passed and returns calls per second
+def ops_per_second(func, min_time):
+    calls = 0
+    batch = 1
+    start = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            func()
+        calls += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+        batch *= 2
+
+
+# Drops the cached distance maps of a Board, so evaluate pays for its path searches as it does after a wall
+def clear_distance_maps(board):
+    distance_maps = getattr(board, "distance_maps", None)
+    if distance_maps is not None:
+        distance_maps.clear()
+
+
+def evaluate_cold(board, color):
+    clear_distance_maps(board)
+    return board.evaluate(color)
+
+
+# Operations per second for the board and AI methods at one position
+def benchmark_operations(board, color, min_time=0.2):
+    ai = AI()
+    piece = board.get_piece_by_color(color)
+    walls = list(board.get_valid_walls())
+    results = {}
+
+    results["get_valid_moves"] = ops_per_second(lambda: board.get_valid_moves(piece), min_time)
+    # One call checks every free wall slot, the rate is per wall checked
+    if walls:
+        checks = ops_per_second(lambda: [board.is_valid_wall(wall) for wall in walls], min_time)
+        results["is_valid_wall"] = checks * len(walls)
+        results["get_legal_walls"] = ops_per_second(lambda: board.get_legal_walls(), min_time)
+    results["shortest_path"] = ops_per_second(
+        lambda: shortest_path(board.horizontal_walls, board.vertical_walls, piece), min_time)
+    results["evaluate"] = ops_per_second(lambda: evaluate_cold(board, color), min_time)
+    results["evaluate_cached"] = ops_per_second(lambda: board.evaluate(color), min_time)
+    results["get_all_actions"] = ops_per_second(lambda: ai.get_all_actions(board, color), min_time)
+    results["get_all_moves"] = ops_per_second(lambda: ai.get_all_moves(board, color), min_time)
+    return results
+
+
+# Fastest of repeated calls of timed_run (at least one, for at least min_time seconds), for timings of a
+# single search that are too short to time once. timed_run returns (seconds, result) so that setting up
+# the board and AI is not timed, the fastest (seconds, result) is returned
+def best_time(timed_run, min_time):
+    best = None
+    start = time.perf_counter()
+    while best is None or time.perf_counter() - start < min_time:
+        run = timed_run()
+        if best is None or run[0] < best[0]:
+            best = run
+    return best
+
+
+# Searches the named position to depth with a fresh AI and board, returning the seconds taken and the
+# nodes searched. The AI is deterministic, so every run searches the same tree, and the race solver is
+# off so the endgame is searched too
+def timed_search(board_class, name, depth, settings=None):
+    board, color = load_position(name, board_class)
+    ai = AI(depth=depth, solve_races=False, deterministic=True, seed=0, **(settings or {}))
+    start = time.perf_counter()
+    ai.search(board, color, max_depth=depth)
+    return time.perf_counter() - start, ai.nodes
+
+
+# Time to reach each depth from 1 to max_depth with the iterative deepening search, and its nodes per second
+def benchmark_search(board_class, name, max_depth=3, min_time=0.2, settings=None):
+    results = {}
+    for depth in range(1, max_depth + 1):
+        seconds, nodes = best_time(lambda: timed_search(board_class, name, depth, settings), min_time)
+        results[str(depth)] = {"seconds": seconds, "nodes": nodes, "nodes_per_sec": nodes / seconds}
+    return results
+
+
+# Time of a depth 2 search with negamax, which copies the board for every child instead of making moves
+def benchmark_copying_negamax(board_class, name, depth=2, min_time=0.2):
+    def timed_negamax():
+        board, color = load_position(name, board_class)
+        ai = AI(depth=depth, deterministic=True, seed=0)
+        start = time.perf_counter()
+        ai.negamax(board, depth, float("-inf"), float("inf"), color)
+        return time.perf_counter() - start, None
+
+    return best_time(timed_negamax, min_time)[0]
+
+
+def run_benchmarks(board_name="board", positions=None, max_depth=3, min_time=0.2, progress=print):
+    board_class = BOARD_CLASSES[board_name]
+    positions = list(POSITIONS) if positions is None else positions
+    results = {
+        "board": board_name,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "min_time": min_time,
+        "max_depth": max_depth,
+        "operations": {},
+        **{mode: {} for mode in SEARCH_MODES},
+        "negamax_seconds": {},
+    }
+
+    for name in positions:
+        if progress:
+            progress(f"Benchmarking {name}")
+        board, color = load_position(name, board_class)
+        results["operations"][name] = benchmark_operations(board, color, min_time)
+        for mode, settings in SEARCH_MODES.items():
+            results[mode][name] = benchmark_search(board_class, name, max_depth, min_time, settings)
+        results["negamax_seconds"][name] = benchmark_copying_negamax(board_class, name, min_time=min_time)
+    return results
+
+
+# Every result as name -> (value, whether a higher value is better)
+def metrics(results):
+    flat = {}
+    for name, operations in results["operations"].items():
+        for operation, rate in operations.items():
+            flat[f"{name}/{operation}"] = (rate, True)
+    for mode in SEARCH_MODES:
+        for name, depths in results.get(mode, {}).items():
+            for depth, search in depths.items():
+                flat[f"{name}/{mode} depth {depth}/seconds"] = (search["seconds"], False)
+                flat[f"{name}/{mode} depth {depth}/nodes_per_sec"] = (search["nodes_per_sec"], True)
+    for name, seconds in results.get("negamax_seconds", {}).items():
+        flat[f"{name}/negamax depth 2/seconds"] = (seconds, False)
+    return flat
+
+
+# (name, baseline value, current value, speed ratio) for every result in both, where a speed ratio
+# below 1 means the current code is slower. Results missing from either side are skipped
+def compare(results, baseline):
+    current_metrics = metrics(results)
+    baseline_metrics = metrics(baseline)
+    comparison = []
+    for name, (value, higher_is_better) in current_metrics.items():
+        if name not in baseline_metrics:
+            continue
+        baseline_value = baseline_metrics[name][0]
+        if value <= 0 or baseline_value <= 0:
+            continue
+        ratio = value / baseline_value if higher_is_better else baseline_value / value
+        comparison.append((name, baseline_value, value, ratio))
+    return comparison
+
+
+# Results more than tolerance slower than the baseline
+def regressions(comparison, tolerance=0.25):
+    return [row for row in comparison if row[3] < 1 - tolerance]
+
+
+def print_results(results):
+    for name, operations in results["operations"].items():
+        print(f"\n{name}")
+        for operation, rate in operations.items():
+            print(f"  {operation:<18}{rate:>14,.0f} ops/sec")
+        for mode in SEARCH_MODES:
+            for depth, search in results[mode][name].items():
+                print(f"  {mode} depth {depth:<{17 - len(mode)}}{search['seconds']:>8.4f} s   "
+                      f"{search['nodes']:>8} nodes {search['nodes_per_sec']:>10,.0f} nodes/sec")
+        print(f"  negamax depth 2   {results['negamax_seconds'][name]:>14.4f} s")
+
+
+def print_comparison(comparison, tolerance):
+    print("\nCompared with the baseline (speed ratio, below 1 is slower):")
+    for name, baseline_value, value, ratio in comparison:
+        flag = "  REGRESSION" if ratio < 1 - tolerance else ""
+        print(f"  {name:<45}{ratio:>6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark move generation, evaluation and search")
+    parser.add_argument("--board", choices=sorted(BOARD_CLASSES), default="board", help="board implementation")
+    parser.add_argument("--positions", nargs="+", choices=list(POSITIONS), help="positions to run (default all)")
+    parser.add_argument("--depth", type=int, default=3, help="deepest search to time")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend timing each operation")
+    parser.add_argument("--output", help="file to save the results to as JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="slowdown allowed before a regression is reported")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.board, args.positions, args.depth, args.min_time)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"\nSaved results as the baseline in {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}, run with --save-baseline to create one")
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline.get("board") != results["board"]:
+        print(f"\nThe baseline was run on {baseline.get('board')}, not comparing")
+        return
+
+    comparison = compare(results, baseline)
+    print_comparison(comparison, args.tolerance)
+    slower = regressions(comparison, args.tolerance)
+    if slower:
+        print(f"\n{len(slower)} results are more than {args.tolerance:.0%} slower than the baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
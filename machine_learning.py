@@ -1,19 +1,19 @@
-from training import TrainingGame, TrainingAI
-from quoridor.constants import BLACK, WHITE
+from tournament import play_game, run_tournament
+from quoridor.opening_book import load_opening_book
+from quoridor.constants import WHITE, BLACK
 import numpy as np
-import pygame
-import time
 from colorama import Fore, Style, init
 init(autoreset=True) 
 
-pygame.init()
-
 
 def generate_random_weights():
     # Range of weights = [0.1, 10]
     return np.random.uniform(low=0.1, high=10, size=4)
 
-def self_play(agent_1_weights, agent_2_weights, num_games=10, timeout_seconds=120):
+# Agents search to depth 2, or deepen for move_time_limit seconds per move if it is given
+# log_stats prints what each agent's searches cost over the game
+def self_play(agent_1_weights, agent_2_weights, num_games=10, timeout_seconds=120, move_time_limit=None, opening_book=None,
+              log_stats=False):
     #agent 1 = White, agent 2 = Black
     agent_1_wins = agent_2_wins = 0
     # Track the number of games that timed out, usually caused by AI being stuck in a loop, default timeout is 120 seconds
@@ -25,58 +25,44 @@ def self_play(agent_1_weights, agent_2_weights, num_games=10, timeout_seconds=12
 
         print(f"\nGame: {game} \nAgent 1 weights: {agent_1_weights}\nAgent 2 weights: {agent_2_weights}")
 
-        run = True
-        clock = pygame.time.Clock()
-        # To visualise the games add pass a pygame window to TrainingGame and uncomment game.update() below
-        game = TrainingGame(None, [agent_1_weights, agent_2_weights])
-        agent_1 = TrainingAI()
-        agent_2 = TrainingAI()
-
-        start_time = time.time()
-        
-        while run:
-            clock.tick(60)
-
-            if time.time() - start_time > timeout_seconds:
-                timeout_games += 1
-                # If the game times out, we can assume both agents are stuck in a loop
-                # Therefore punish the agent we are training by giving the other agent a win
-                agent_2_wins += 1
-                run = False
-                break
-
-            if game.turn == WHITE:
-                _, new_board, _ = agent_1.negamax(game.get_board(), 2, float("-inf"), float("inf"), WHITE)
-                if new_board is not None:
-                    game.ai_move(new_board)
-            
-            if game.turn == BLACK:
-                _, new_board, _ = agent_2.negamax(game.get_board(), 2, float("-inf"), float("inf"), BLACK)
-                if new_board is not None:
-                    game.ai_move(new_board)
-            
-            if game.winner() != None:
-                if game.winner() == WHITE:
-                    agent_1_wins += 1
-                else:
-                    agent_2_wins += 1
-                run = False
-                    
-            # game.update()
+        result = play_game(game, agent_1_weights, agent_2_weights, seed=np.random.randint(2 ** 31),
+                           timeout_seconds=timeout_seconds, move_time_limit=move_time_limit, opening_book=opening_book)
+        if log_stats:
+            for agent, color in (("Agent 1", WHITE), ("Agent 2", BLACK)):
+                print(f"{agent} search: {result.search_stats[color].summary()}")
+
+        if result.timed_out:
+            timeout_games += 1
+        # If the game times out, we can assume both agents are stuck in a loop
+        # Therefore punish the agent we are training by giving the other agent a win
+        if result.agent_1_won():
+            agent_1_wins += 1
+        else:
+            agent_2_wins += 1
+
     print(f"Timeout games: {timeout_games}")
     print(f"Agent 1 wins: {agent_1_wins}, Agent 2 wins: {agent_2_wins} \n")
-    pygame.quit()
     return agent_1_wins, agent_2_wins
 
 
-def evaluate_population(population):
+# Each agent plays num_games games against one random opponent of its own, with all games of the
+# population shared out across worker processes
+def evaluate_population(population, num_games=10, workers=None, timeout_seconds=120, move_time_limit=None, opening_book=None):
+    opponents = [generate_random_weights() for _ in population]
+    pairings = [(weights, opponent) for weights, opponent in zip(population, opponents) for _ in range(num_games)]
+    # Seeds come from numpy's generator so seeding it makes the whole evaluation reproducible
+    results = run_tournament(pairings, workers=workers, base_seed=np.random.randint(2 ** 31),
+                             timeout_seconds=timeout_seconds, move_time_limit=move_time_limit, opening_book=opening_book)
+
     scores = []
-    for weights in population:
-        # Each agent plays against a random opponent to evaluate their performance
-        agent_1_wins, agent_2_wins = self_play(weights, generate_random_weights())
-        total_games = agent_1_wins + agent_2_wins
+    for i, weights in enumerate(population):
+        games = results[i * num_games:(i + 1) * num_games]
+        # Timed out or unfinished games count as wins for the opponent
+        agent_1_wins = sum(1 for result in games if result.agent_1_won())
+        timeout_games = sum(1 for result in games if result.timed_out)
         # Calculate win rate for agent 1 (the one we are training)
-        win_rate = agent_1_wins / total_games if total_games > 0 else 0  
+        win_rate = agent_1_wins / len(games) if games else 0
+        print(f"Agent 1 weights: {weights}, wins: {agent_1_wins}/{len(games)}, timeout games: {timeout_games}")
         scores.append((win_rate, weights))
     
     # Sort population based on highest win rates
@@ -116,11 +102,18 @@ def generate_next_generation(selected_population, population_size):
     return next_population
 
 
-def main():
+def main(seed=None):
+    # Seeding numpy makes a training run reproducible, since every game seed is drawn from it
+    if seed is not None:
+        np.random.seed(seed)
+
     # Set the initial population size to large to consider various weights 
     initial_population_size = 50
     population = [generate_random_weights() for _ in range(initial_population_size)]
 
+    # Opening moves come from the book (if it has been built) instead of being searched in every game
+    opening_book = load_opening_book()
+
     # Set population size of subsequent generations to lower value and consider only top performers of the initial ones
     population_size = 10
     num_generations = 12
@@ -131,7 +124,7 @@ def main():
             file.write(f"Generation {generation+1}\n")
 
             # Evaluate the population and sort them based on win rates
-            sorted_population = evaluate_population(population)
+            sorted_population = evaluate_population(population, opening_book=opening_book)
             # Select the top performers based on a retain ratio
             top_performers = select_top_performers(sorted_population)
 
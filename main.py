@@ -4,6 +4,8 @@ from quoridor.constants import *
 from quoridor.game import Game
 from quoridor.wall import Wall
 from quoridor.ai import AI
+from quoridor.opening_book import load_opening_book
+from quoridor.background_search import BackgroundSearch
 from ui import render_main_menu, game_over_screen
 
 
@@ -25,13 +27,6 @@ thinking_text = pygame_gui.elements.UILabel(pygame.Rect((WIDTH - 220, HEIGHT - 7
                                             manager, 
                                             visible=False)
 
-# Handles when selected part of screen is a divider
-class WallSelection:
-    def __init__(self, row, col, orientation):
-        self.row = row
-        self.col = col
-        self.orientation = orientation
-
 # Handles when selected part of screen is a square
 class SquareSelection:
     def __init__(self, row, col):
@@ -57,19 +52,19 @@ def get_selection_from_mouse(pos):
     if WALL_THICKNESS <= x_remainder <= SQUARE_SIZE - WALL_THICKNESS:
         # Horizontal wall selection above the square
         if y_remainder < WALL_THICKNESS:
-            return WallSelection(row - 1, col, "horizontal")
+            return Wall(row - 1, col, "horizontal")
         # Horizontal wall selection below the square
         elif y_remainder > SQUARE_SIZE - WALL_THICKNESS:  
-            return WallSelection(row, col, "horizontal")
+            return Wall(row, col, "horizontal")
 
     # Check for vertical wall selection (between columns)
     if WALL_THICKNESS <= y_remainder <= SQUARE_SIZE - WALL_THICKNESS:
         # Vertical wall selection to the left
         if x_remainder < WALL_THICKNESS:  
-            return WallSelection(row, col, "vertical")
+            return Wall(row, col, "vertical")
         # Vertical wall selection to the right
         elif x_remainder > SQUARE_SIZE - WALL_THICKNESS:  
-            return WallSelection(row, col + 1, "vertical") 
+            return Wall(row, col + 1, "vertical") 
 
     # If no wall detected return square selection
     return SquareSelection(row, col)
@@ -81,50 +76,59 @@ def main():
 
     run = True
     game = Game(WIN)
+    ai = None
+    searcher = None
     if black_is_ai or white_is_ai:
-        ai = AI(depth=2)
+        # Book positions are played without searching and the principal variation search with aspiration
+        # windows reaches deeper in the time limit. Late move reductions can change the result of the search,
+        # so they stay off until a match shows they play stronger, and the root-parallel search (workers)
+        # stays off until it is shown to be faster than the serial search in wall clock time
+        ai = AI(time_limit=AI_TIME_LIMIT, opening_book=load_opening_book(), pvs=True, aspiration_window=10.0)
+        # The AI thinks on a worker thread so the window keeps redrawing and handling events meanwhile
+        searcher = BackgroundSearch(ai)
+    thinking = False
 
     print("\n--- New Game ---")
     while run:
         time_delta = clock.tick(FPS) / 1000.0
 
-        # Progress callback function to update the progress bar when AI is making a move
-        def update_progress(progress):
-            progress_bar.set_current_progress(progress)
-            manager.update(time_delta)
-            manager.draw_ui(WIN)
-            pygame.display.update()
-
-        if game.turn == WHITE and white_is_ai:
-            thinking_text.show()
-            progress_bar.show()
-
-            # Get the best move the AI evaluated
-            _, new_board, move = ai.negamax(game.get_board(), ai.depth, float("-inf"), float("inf"), WHITE, progress_callback=update_progress)
-            thinking_text.hide()
-            progress_bar.hide()
-
-            if new_board is not None and move is not None:
-                # Make the AI move
-                game.ai_move(new_board)
-                game.print_move(move)
-        
-        if game.turn == BLACK and black_is_ai:
-            progress_bar.show()
-            thinking_text.show()
-
-            _, new_board, move = ai.negamax(game.get_board(), ai.depth, float("-inf"), float("inf"), BLACK, progress_callback=update_progress)
-            thinking_text.hide()
-            progress_bar.hide()
-
-            if new_board is not None and move is not None:
-                game.ai_move(new_board)
-                game.print_move(move)
+        ai_turn = (game.turn == WHITE and white_is_ai) or (game.turn == BLACK and black_is_ai)
+        if ai_turn and game.winner() is None:
+            if not thinking:
+                # Carries on with the pondered search if the human played the predicted move
+                searcher.start(game.get_board(), game.turn)
+                thinking = True
+                thinking_text.show()
+                progress_bar.show()
+
+            progress_bar.set_current_progress(searcher.progress)
+
+            if searcher.done():
+                # Get the best move the AI evaluated
+                _, move = searcher.result()
+                thinking = False
+                thinking_text.hide()
+                progress_bar.hide()
+
+                if move is not None:
+                    # Make the AI move
+                    ai_color = game.turn
+                    game.ai_move(move)
+                    game.print_move(move)
+                    if LOG_SEARCH_STATS:
+                        print(f"Search: {ai.stats.summary()}")
+                    # Think about the next move while the human thinks about theirs
+                    human_turn = (game.turn == WHITE and not white_is_ai) or (game.turn == BLACK and not black_is_ai)
+                    if human_turn and game.winner() is None:
+                        searcher.ponder(game.get_board(), ai_color)
 
         if game.winner() != None:
             winner = "White" if game.winner() == WHITE else "Black"
             # Display game over screen and determine if user wants to play again
             play_again = game_over_screen(winner)
+            if ai is not None:
+                searcher.close()
+                ai.close()
             if play_again:
                 main()
             else:
@@ -139,9 +143,8 @@ def main():
                 # Handles mouse clicks i.e. placing walls and selecting squares
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     selection = get_selection_from_mouse(pos)
-                    if isinstance(selection, WallSelection):
-                        wall = Wall(selection.row, selection.col, selection.orientation)
-                        game.place_wall(wall)
+                    if isinstance(selection, Wall):
+                        game.place_wall(selection)
                     if isinstance(selection, SquareSelection):
                         game.select_square(selection.row, selection.col)
                 
@@ -149,9 +152,8 @@ def main():
                 if event.type == pygame.MOUSEMOTION:
                     pos = pygame.mouse.get_pos()
                     selection =  get_selection_from_mouse(pos)
-                    if isinstance(selection, WallSelection):
-                        wall = Wall(selection.row, selection.col, selection.orientation)
-                        game.wall_hovered = wall
+                    if isinstance(selection, Wall):
+                        game.wall_hovered = selection
                     if isinstance(selection, SquareSelection):
                         game.wall_hovered = None
 
@@ -161,6 +163,9 @@ def main():
         manager.update(time_delta)
         manager.draw_ui(WIN)
         pygame.display.update()
+    if ai is not None:
+        searcher.close()
+        ai.close()
     pygame.quit()
 
 
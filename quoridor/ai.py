@@ -1,16 +1,204 @@
-from copy import deepcopy
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 
 from quoridor.board import Board
+from quoridor.bitboard import BitBoard
+from quoridor.wall import Wall
+from quoridor.piece import Piece
+from quoridor.move import encode_action, decode_action, is_legal_action
 from .constants import BLACK, WHITE, ROWS, COLS
+from .pathfinding import timing_path_searches
+from .race import RaceSolver
+from .search_stats import SearchStats
+from .transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# Upper limit on iterative deepening when only a time budget is given
+MAX_SEARCH_DEPTH = 20
+
+# Width of the window used to test whether a move beats alpha, scores are floats so it only needs to be small
+NULL_WINDOW = 1e-3
+# Walls searched after this many better ranked actions are reduced by late move reductions, by two plies
+# since scores swing with which player moved last at the horizon and an odd reduction would compare the
+# reduced search against the other player's horizon
+LATE_MOVE_INDEX = 6
+LATE_MOVE_REDUCTION = 2
+
+# Root values closer than this count as a tie in deterministic mode
+TIE_MARGIN = 1e-9
+
+
+# Raised inside the search when the time budget runs out
+class SearchTimeout(Exception):
+    pass
+
+
+# Each worker process keeps one AI per configuration so its transposition table stays warm between tasks
+_worker_ais = {}
+
+
+# Runs in a worker process: searches one root action (packed with encode_action) to depth - 1 within the
+# window alpha, beta of color and returns its value for color, or None if the time budget ran out first,
+# with the SearchStats of the search
+def search_root_action(ai_class, settings, board_class, state, action_code, color, depth, time_left=None, generation=None,
+                       alpha=float("-inf"), beta=float("inf")):
+    key = (ai_class, tuple(sorted(settings.items())))
+    ai = _worker_ais.get(key)
+    if ai is None:
+        ai = _worker_ais[key] = ai_class(**settings)
+
+    board = board_class.deserialize(state)
+    board.make_move(decode_action(action_code), color)
+    ai.deadline = None if time_left is None else time.perf_counter() + time_left
+    ai.reset_statistics()
+    # The search starts below the root, where the table never starts a new generation, so the worker's
+    # table follows the generation of the parent's
+    if ai.transposition_table is not None and generation is not None:
+        ai.transposition_table.generation = generation
+    try:
+        with timing_path_searches(ai.stats):
+            value, _ = ai.negamax_in_place(board, depth - 1, -beta, -alpha, ai.opposite_color(color), ply=1)
+    except SearchTimeout:
+        return None, ai.stats
+    finally:
+        ai.deadline = None
+    return -value, ai.stats
+
 
 class AI:
-    def __init__(self, depth=2):
+    # A table size of 0 or None turns the transposition table off
+    # A time limit (in seconds) makes search deepen until the budget is used instead of stopping at depth
+    # With more than one worker, root moves are searched in parallel across that many processes
+    # opening_book (an OpeningBook) is checked before searching, positions found in it are played instantly
+    # solve_races plays positions where neither player has a wall left from an exact solver instead of searching
+    # pvs searches every move after the first with a null window and only re-searches the ones that beat alpha,
+    # late_move_reductions searches low ranked walls a ply shallower first, and aspiration_window (a score
+    # margin) starts each iteration with a window around the score of the previous one
+    # deterministic leaves the random term out of the evaluation, so a position always gets the same score
+    # and leaf scores are memoized during a search. Equal best moves at the root are then chosen between
+    # with a generator seeded with seed, so the same seed always plays the same game
+    # The statistics of the last search are left in stats (a SearchStats)
+    def __init__(self, depth=2, table_size=2 ** 16, time_limit=None, move_ordering=True, workers=None,
+                 opening_book=None, solve_races=True, pvs=False, late_move_reductions=False, aspiration_window=None,
+                 deterministic=False, seed=None):
         self.depth = depth
+        self.deterministic = deterministic
+        self.rng = random.Random(seed)
+        # Leaf scores by position key, only used in deterministic mode and cleared at the start of each search
+        self.leaf_cache = {}
+        self.pvs = pvs
+        self.late_move_reductions = late_move_reductions
+        self.aspiration_window = aspiration_window
+        self.opening_book = opening_book
+        self.race_solver = RaceSolver() if solve_races else None
+        self.time_limit = time_limit
+        self.move_ordering = move_ordering
+        self.table_size = table_size
+        self.workers = workers
+        self.executor = None
+        self.transposition_table = TranspositionTable(table_size) if table_size else None
+        # Up to two moves per ply that recently caused a cutoff, and cutoff scores per (color, action)
+        self.killers = {}
+        self.history = {}
+        self.reset_statistics()
+        self.deadline = None
+        # Set (a threading.Event) while a search can be stopped from another thread
+        self.stop_event = None
+        # Best root action of the last completed iteration, searched first in the next one
+        self.root_move = None
+        self.completed_depth = 0
+
+    # Iterative deepening: searches depth 1, 2, 3, ... and returns the best value and action of the deepest
+    # completed iteration once max_depth is reached, the time limit runs out or stop_event is set
+    def search(self, board, color, time_limit=None, max_depth=None, progress_callback=None, stop_event=None):
+        if time_limit is None:
+            time_limit = self.time_limit
+        if max_depth is None:
+            max_depth = self.depth if time_limit is None else MAX_SEARCH_DEPTH
+
+        start_time = time.perf_counter()
+        undo_depth = len(board.undo_stack)
+        best_value, best_action = None, None
+        self.root_move = None
+        self.completed_depth = 0
+        self.reset_statistics()
+
+        if self.opening_book is not None:
+            book_move = self.opening_book.lookup(board, color)
+            if book_move is not None:
+                return book_move
+        if self.race_solver is not None:
+            solution = self.race_solver.solve(board, color)
+            if solution is not None:
+                return solution
+        self.killers = {}
+        self.leaf_cache = {}
+        self.stop_event = stop_event
+        # Older history counts matter less than the ones gathered for this move
+        self.history = {key: score // 2 for key, score in self.history.items() if score > 1}
+        stats = self.stats
+
+        # With a time limit the progress bar follows the time used, otherwise it follows the final iteration
+        def report_progress(progress):
+            if time_limit is not None:
+                progress_callback(min(100, (time.perf_counter() - start_time) / time_limit * 100))
+            elif depth == max_depth:
+                progress_callback(progress)
+
+        # Value of every completed iteration, the search alternates between the two players' points of view
+        # at the horizon so the aspiration window is centred on the last iteration of the same parity
+        values = []
+        for depth in range(1, max_depth + 1):
+            try:
+                with timing_path_searches(stats):
+                    if self.workers and self.workers > 1:
+                        value, action = self.negamax_parallel(board, depth, color,
+                                                              progress_callback=report_progress if progress_callback else None)
+                    else:
+                        value, action = self.search_root(board, depth, color, values[-2] if len(values) >= 2 else None,
+                                                         progress_callback=report_progress if progress_callback else None)
+            except SearchTimeout:
+                # Take back the moves of the unfinished iteration
+                while len(board.undo_stack) > undo_depth:
+                    board.unmake_move()
+                break
+
+            best_value, best_action = value, action
+            values.append(value)
+            self.root_move = action
+            self.completed_depth = stats.depth = depth
+
+            # Only start the clock once depth 1 is done so there is always a move to play
+            if time_limit is not None:
+                self.deadline = start_time + time_limit
+                if time.perf_counter() >= self.deadline:
+                    break
+            # Game is decided within the searched depth, deeper iterations give the same answer
+            if abs(value) >= 10000:
+                break
+
+        self.deadline = None
+        self.stop_event = None
+        self.root_move = None
+        stats.elapsed = time.perf_counter() - start_time
+        return best_value, best_action
     
+    # One iteration of the serial search. With an aspiration window the search starts with a window around
+    # previous_value and is repeated with the full window if the value falls outside it
+    def search_root(self, board, depth, color, previous_value=None, progress_callback=None):
+        if self.aspiration_window and previous_value is not None and abs(previous_value) < 10000:
+            alpha = previous_value - self.aspiration_window
+            beta = previous_value + self.aspiration_window
+            value, action = self.negamax_in_place(board, depth, alpha, beta, color, progress_callback=progress_callback)
+            if alpha < value < beta:
+                return value, action
+            self.stats.researches += 1
+        return self.negamax_in_place(board, depth, float("-inf"), float("inf"), color, progress_callback=progress_callback)
+
     # Recursive minimax function optimised for two players
     def negamax(self, board, depth, alpha, beta, color, progress_callback=None):
         if depth == 0 or board.winner() is not None:
-            evaluation = board.evaluate(color)
+            evaluation = self.evaluate(board, color)
             return evaluation, board, None
 
         # Best move is the board state returned after the move
@@ -41,6 +229,330 @@ class AI:
 
         return best_value, best_move, best_action
 
+    # Negamax that applies and undoes moves on one board instead of copying the board for every child
+    # Returns the best value and the best action (piece move or wall placement) rather than a board state
+    def negamax_in_place(self, board, depth, alpha, beta, color, progress_callback=None, ply=0):
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeout()
+
+        stats = self.stats
+        stats.nodes += 1
+        if depth == 0 or board.winner() is not None:
+            stats.leaves += 1
+            start = time.perf_counter()
+            value = self.evaluate(board, color)
+            stats.evaluation_time += time.perf_counter() - start
+            return value, None
+
+        table = self.transposition_table
+        original_alpha = alpha
+        table_move = None
+
+        if table is not None:
+            if ply == 0:
+                table.new_search()
+            key = board.zobrist_key(color)
+            entry = table.probe(key)
+            if entry is not None:
+                table_move = entry.best_move
+                # Reuse a result from an equal or deeper search of the same position, except at the root
+                # where the search always runs so the progress callback and best action are fresh
+                if ply > 0 and entry.depth >= depth:
+                    if entry.flag == EXACT:
+                        return entry.value, entry.best_move
+                    if entry.flag == LOWER_BOUND:
+                        alpha = max(alpha, entry.value)
+                    else:
+                        beta = min(beta, entry.value)
+                    if alpha >= beta:
+                        return entry.value, entry.best_move
+
+        best_action = None
+        best_value = float("-inf")
+
+        start = time.perf_counter()
+        actions = self.get_all_actions(board, color)
+        # Search the best move found previously for this position first
+        if ply == 0 and self.root_move is not None:
+            table_move = self.root_move
+        # Just above the leaves the ordering costs more than the cutoffs it gains
+        if self.move_ordering and depth > 1:
+            actions = self.order_moves(board, actions, color, ply, table_move)
+        elif table_move is not None and table_move in actions:
+            actions.remove(table_move)
+            actions.insert(0, table_move)
+        num_actions = len(actions)
+        stats.movegen_time += time.perf_counter() - start
+        stats.expanded += 1
+        stats.actions += num_actions
+
+        # In deterministic mode moves at the root are searched with alpha just below the best value, so a
+        # move as good as the best gets its exact value rather than a bound and can join the ties
+        tie_break = ply == 0 and self.deterministic
+        tied_actions = []
+
+        for i, action in enumerate(actions):
+            board.make_move(action, color)
+            evaluation = self.search_child(board, depth, alpha - TIE_MARGIN if tie_break else alpha, beta, color, ply, i, action)
+            board.unmake_move()
+
+            if tie_break:
+                if evaluation > best_value + TIE_MARGIN:
+                    tied_actions = [action]
+                elif evaluation > best_value - TIE_MARGIN:
+                    tied_actions.append(action)
+
+            if evaluation > best_value:
+                best_value = evaluation
+                best_action = action
+
+            # Alpha-beta pruning
+            alpha = max(alpha, evaluation)
+            if beta <= alpha:
+                self.record_cutoff(action, color, depth, ply, i)
+                break
+
+            if progress_callback:
+                progress = ((i + 1) / num_actions) * 100
+                progress_callback(progress)
+
+        if len(tied_actions) > 1:
+            best_action = self.rng.choice(tied_actions)
+
+        if table is not None:
+            if best_value <= original_alpha:
+                flag = UPPER_BOUND
+            elif best_value >= beta:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            table.store(key, depth, best_value, flag, best_action)
+
+        return best_value, best_action
+
+    # Value for color of the action just made on board, the index-th action searched at this node
+    # Without pvs or a reduction this is a plain full window search. Otherwise the action is first tested
+    # with a null window around alpha (shallower for reduced walls): if it cannot beat alpha that
+    # bound is enough, if a full depth test already reaches beta it causes a cutoff, and only otherwise
+    # is it searched again with the full window
+    def search_child(self, board, depth, alpha, beta, color, ply, index, action):
+        opponent = self.opposite_color(color)
+        reduction = 0
+        if (self.late_move_reductions and self.move_ordering and depth >= 3 and index >= LATE_MOVE_INDEX and
+                isinstance(action, Wall)):
+            reduction = LATE_MOVE_REDUCTION
+
+        if index > 0 and (self.pvs or reduction):
+            value = -self.negamax_in_place(board, depth - 1 - reduction, -alpha - NULL_WINDOW, -alpha, opponent, ply=ply + 1)[0]
+            if value <= alpha:
+                return value
+            if not reduction and value >= beta:
+                return value
+            self.stats.researches += 1
+        return -self.negamax_in_place(board, depth - 1, -beta, -alpha, opponent, ply=ply + 1)[0]
+
+    # The move the last searches expect color to play on board, taken from the transposition table,
+    # or None if the position is not in the table
+    def predicted_move(self, board, color):
+        if self.transposition_table is None:
+            return None
+        entry = self.transposition_table.probe(board.zobrist_key(color))
+        if entry is None or entry.best_move is None or not is_legal_action(board, entry.best_move, color):
+            return None
+        return entry.best_move
+
+    # Score of a leaf for color, in deterministic mode without the random term and memoized by position
+    def evaluate(self, board, color):
+        if not self.deterministic:
+            return board.evaluate(color)
+
+        key = board.zobrist_key(color)
+        value = self.leaf_cache.get(key)
+        if value is None:
+            if len(self.leaf_cache) >= (self.table_size or 2 ** 16):
+                self.leaf_cache.clear()
+            value = self.leaf_cache[key] = board.evaluate(color, noise=0)
+        return value
+
+    # Root-parallel search: the first (principal variation) action is searched here with a full window, then
+    # every other action is tested by a worker process with a null window around its value, and only the
+    # actions that beat it are searched again with a full window. The results are combined in the same
+    # order as the serial search, so with a deterministic evaluation it picks the same value and action
+    # as negamax_in_place
+    def negamax_parallel(self, board, depth, color, progress_callback=None):
+        if depth <= 1 or board.winner() is not None:
+            return self.negamax_in_place(board, depth, float("-inf"), float("inf"), color, progress_callback)
+
+        actions = self.get_all_actions(board, color)
+        if self.move_ordering:
+            actions = self.order_moves(board, actions, color, 0, self.root_move)
+        elif self.root_move is not None and self.root_move in actions:
+            actions.remove(self.root_move)
+            actions.insert(0, self.root_move)
+
+        # One table generation per iteration as in the serial search, shared with the workers' tables
+        generation = None
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+            generation = self.transposition_table.generation
+
+        values = [None] * len(actions)
+        board.make_move(actions[0], color)
+        values[0] = -self.negamax_in_place(board, depth - 1, float("-inf"), float("inf"), self.opposite_color(color), ply=1)[0]
+        board.unmake_move()
+        if progress_callback:
+            progress_callback(1 / len(actions) * 100)
+        if len(actions) == 1:
+            return values[0], actions[0]
+
+        # In deterministic mode the test is just below the first value so actions as good join the ties
+        alpha = values[0] - TIE_MARGIN if self.deterministic else values[0]
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        settings = {"depth": self.depth, "table_size": self.table_size, "move_ordering": self.move_ordering,
+                    "pvs": self.pvs, "late_move_reductions": self.late_move_reductions,
+                    "deterministic": self.deterministic}
+        state = board.serialize()
+
+        # The time left is taken as each root move is sent, so re-searches sent late get only what remains
+        def submit(i, beta):
+            time_left = None if self.deadline is None else self.deadline - time.perf_counter()
+            return self.executor.submit(search_root_action, type(self), settings, type(board), state, encode_action(actions[i]),
+                                        color, depth, time_left, generation, alpha, beta)
+
+        # Future -> (action index, whether it is a full window search)
+        pending = {submit(i, alpha + NULL_WINDOW): (i, False) for i in range(1, len(actions))}
+        finished = 1
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            if self.stop_event is not None and self.stop_event.is_set():
+                for future in pending:
+                    future.cancel()
+                raise SearchTimeout()
+            for future in done:
+                i, full_window = pending.pop(future)
+                value, stats = future.result()
+                self.stats.merge(stats)
+                if value is None:
+                    for other in pending:
+                        other.cancel()
+                    raise SearchTimeout()
+                # The action beat the first one, its exact value needs a full window
+                if not full_window and value > alpha:
+                    self.stats.researches += 1
+                    pending[submit(i, float("inf"))] = (i, True)
+                    continue
+                values[i] = value
+                finished += 1
+                if progress_callback:
+                    progress_callback(finished / len(actions) * 100)
+
+        # First action with the highest value, as in the serial search. Actions that failed the test only
+        # have an upper bound at or below alpha, so they can neither be best nor tie with the best
+        best_index = 0
+        for i, value in enumerate(values):
+            if value > values[best_index]:
+                best_index = i
+        if self.deterministic:
+            tied = [i for i, value in enumerate(values) if value > values[best_index] - TIE_MARGIN]
+            best_index = self.rng.choice(tied) if len(tied) > 1 else best_index
+        return values[best_index], actions[best_index]
+
+    # Shuts down the worker processes used by the parallel search
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def reset_statistics(self):
+        self.stats = SearchStats()
+
+    # Counts of the last search, kept from before they moved into stats
+    @property
+    def nodes(self):
+        return self.stats.nodes
+
+    @property
+    def cutoffs(self):
+        return self.stats.cutoffs
+
+    @property
+    def first_move_cutoffs(self):
+        return self.stats.first_move_cutoffs
+
+    @property
+    def researches(self):
+        return self.stats.researches
+
+    # Share of cutoffs caused by the first move searched, the closer to 1 the better the move ordering
+    def cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def record_cutoff(self, action, color, depth, ply, index):
+        stats = self.stats
+        stats.cutoffs_by_ply[ply] = stats.cutoffs_by_ply.get(ply, 0) + 1
+        if index == 0:
+            stats.first_move_cutoffs += 1
+
+        killers = self.killers.setdefault(ply, [])
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[2:]
+        self.history[(color, action)] = self.history.get((color, action), 0) + depth * depth
+
+    # Orders actions so the ones most likely to cause a cutoff are searched first:
+    # the transposition table or previous iteration move, piece moves that shorten our path,
+    # killer moves for this ply, walls that cross the opponent's shortest path, then the rest by history
+    def order_moves(self, board, actions, color, ply, first_move=None):
+        distances = board.get_distance_map(color)
+        piece = board.get_piece_by_color(color)
+        current_distance = distances[piece.row][piece.col]
+        opponent_steps = self.shortest_path_steps(board, self.opposite_color(color))
+        killers = self.killers.get(ply, ())
+        history = self.history
+
+        def score(action):
+            if first_move is not None and action == first_move:
+                return 4e9
+            history_score = history.get((color, action), 0)
+            if isinstance(action, Wall):
+                if action in killers:
+                    return 2e9 + history_score
+                for step in action.blocked_edges():
+                    if step in opponent_steps:
+                        return 1e9 + history_score
+                return history_score
+
+            gain = current_distance - distances[action[0]][action[1]]
+            if gain > 0:
+                return 3e9 + gain * 1e6 + history_score
+            if action in killers:
+                return 2e9 + history_score
+            return history_score
+
+        return sorted(actions, key=score, reverse=True)
+
+    # Steps (pairs of adjacent squares, in both directions) along one shortest path of the piece of color
+    def shortest_path_steps(self, board, color):
+        distances = board.get_distance_map(color)
+        piece = board.get_piece_by_color(color)
+        row, col = piece.row, piece.col
+        steps = set()
+
+        while distances[row][col]:
+            for next_row, next_col in ((row + 1, col), (row - 1, col), (row, col + 1), (row, col - 1)):
+                if (0 <= next_row < ROWS and 0 <= next_col < COLS and
+                        distances[next_row][next_col] == distances[row][col] - 1 and
+                        not board.is_wall_between(row, col, next_row, next_col)):
+                    steps.add(((row, col), (next_row, next_col)))
+                    steps.add(((next_row, next_col), (row, col)))
+                    row, col = next_row, next_col
+                    break
+        return steps
+
     def opposite_color(self, color):
         return WHITE if color == BLACK else BLACK
 
@@ -62,32 +574,39 @@ class AI:
         moves = []
 
         piece = board.get_piece_by_color(color)
-        valid_moves = board.get_valid_moves(piece)
 
-        for move in valid_moves:
+        for action in self.get_all_actions(board, color):
             temp_board = self.partial_deepcopy(board)
-            temp_piece = temp_board.get_piece(piece.row, piece.col)
-            new_board = self.simulate_piece_move(temp_piece, move, temp_board)
-            moves.append((new_board, move))
+            if isinstance(action, Wall):
+                new_board = self.simulate_wall(action, temp_board, color)
+            else:
+                temp_piece = temp_board.get_piece(piece.row, piece.col)
+                new_board = self.simulate_piece_move(temp_piece, action, temp_board)
+            moves.append((new_board, action))
+
+        return moves
+
+    # All piece moves and heuristically filtered legal walls for a player, without building any boards
+    def get_all_actions(self, board, color):
+        piece = board.get_piece_by_color(color)
+        actions = list(board.get_valid_moves(piece))
 
         # Dont consider wall placement if no walls left
         walls = board.black_walls if color == BLACK else board.white_walls
         if walls == 0:
-            return moves
+            return actions
 
         valid_walls = board.get_valid_walls()
         # Only consider subset of walls based on heuristics
         walls_to_consider = self.filter_walls(board, valid_walls, color)
 
-        for wall in walls_to_consider:
-            if not board.is_valid_wall(wall):
-                continue
+        legal_walls = board.get_legal_walls(walls_to_consider)
+        actions.extend(legal_walls)
+        # Walls left out because they would cut a player off from their goal
+        self.stats.walls_generated += len(walls_to_consider)
+        self.stats.walls_rejected += len(walls_to_consider) - len(legal_walls)
 
-            temp_board = self.partial_deepcopy(board)
-            new_board = self.simulate_wall(wall, temp_board, color)
-            moves.append((new_board, wall))
-
-        return moves
+        return actions
 
 
     def filter_walls(self, board, valid_walls, color):
@@ -107,25 +626,34 @@ class AI:
                 continue  # Prioritize walls near pawns
 
             # Heuristic 2: Walls adjacent to existing walls
-            if (row, col - 1, orientation) in board.valid_walls or (row, col + 1, orientation) in board.valid_walls or \
-            (row - 1, col, orientation) in board.valid_walls or (row + 1, col, orientation) in board.valid_walls:
+            if (row, col - 1, orientation) in valid_walls or (row, col + 1, orientation) in valid_walls or \
+            (row - 1, col, orientation) in valid_walls or (row + 1, col, orientation) in valid_walls:
                 filtered_walls.append(wall)
                 continue  # Prioritize walls that extend an existing structure
         return filtered_walls
 
 
     def partial_deepcopy(self, board):
+        # Bitboards are copied in constant time without building a new Board
+        if isinstance(board, BitBoard):
+            return board.copy()
+
         new_board = Board()
 
-        new_board.board = [
-            [cell if isinstance(cell, int) else deepcopy(cell) for cell in row]
-            for row in board.board
-        ]
+        new_board.board = [row.copy() for row in board.board]
+        new_board.pieces = {}
+        for color, piece in board.pieces.items():
+            new_board.pieces[color] = new_board.board[piece.row][piece.col] = Piece(piece.row, piece.col, color)
+        new_board.winner_color = board.winner_color
         new_board.horizontal_walls = board.horizontal_walls.copy()
         new_board.vertical_walls = board.vertical_walls.copy()
+        new_board.blocked_edges = board.blocked_edges.copy()
         new_board.valid_walls = board.valid_walls.copy()
         new_board.white_walls = board.white_walls
         new_board.black_walls = board.black_walls
+        # Distance maps are replaced rather than modified, so the copy can share them
+        new_board.distance_maps = board.distance_maps.copy()
+        new_board.hash = board.hash
 
         return new_board
 
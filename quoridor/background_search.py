@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundSearch:
+    # Runs AI.search on a worker thread so the caller (the pygame loop) keeps running while the AI thinks
+    # The search works on its own copy of the board, and a running search can be cancelled at any time
+    def __init__(self, ai):
+        self.ai = ai
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.future = None
+        self.stop_event = None
+        # Latest progress reported by the search, from 0 to 100
+        self.progress = 0
+        # Key of the position being pondered, and how often the opponent played the predicted move
+        self.ponder_key = None
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+
+    # Starts searching board for color, cancelling any search still running
+    # If the position is the one being pondered, the ponder search carries on (or has finished) instead
+    def start(self, board, color, **search_options):
+        if self.ponder_key is not None:
+            if self.future is not None and board.zobrist_key(color) == self.ponder_key:
+                self.ponder_key = None
+                self.ponder_hits += 1
+                return self.future
+            self.ponder_misses += 1
+
+        self.cancel()
+        board_copy = type(board).deserialize(board.serialize())
+        self.stop_event = threading.Event()
+        self.progress = 0
+        self.future = self.executor.submit(self._search, board_copy, color, self.stop_event, search_options)
+        return self.future
+
+    # Uses the opponent's thinking time: called with the position after color has moved, it searches the
+    # position after the opponent's predicted reply. A later start on that position reuses this search,
+    # any other position cancels it, and the new search still gains from the warm transposition table
+    def ponder(self, board, color, **search_options):
+        self.cancel()
+        opponent = self.ai.opposite_color(color)
+        reply = self.ai.predicted_move(board, opponent)
+        if reply is None or board.winner() is not None:
+            return False
+
+        board_copy = type(board).deserialize(board.serialize())
+        board_copy.make_move(reply, opponent)
+        if board_copy.winner() is not None:
+            return False
+        self.start(board_copy, color, **search_options)
+        self.ponder_key = board_copy.zobrist_key(color)
+        return True
+
+    def _search(self, board, color, stop_event, search_options):
+        return self.ai.search(board, color, progress_callback=self._set_progress, stop_event=stop_event, **search_options)
+
+    def _set_progress(self, progress):
+        self.progress = progress
+
+    def running(self):
+        return self.future is not None and not self.future.done()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    # (value, action) of the finished search, waiting for it if it is still running
+    def result(self, timeout=None):
+        value, action = self.future.result(timeout)
+        self.future = None
+        return value, action
+
+    # Stops the running search, its result is thrown away
+    def cancel(self):
+        self.ponder_key = None
+        if self.future is not None:
+            self.stop_event.set()
+            self.future = None
+
+    def close(self):
+        self.cancel()
+        self.executor.shutdown(wait=True)
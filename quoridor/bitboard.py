@@ -0,0 +1,445 @@
+import random
+
+from quoridor.wall import Wall, HORIZONTAL, VERTICAL
+from .board import Board
+from .constants import ROWS, COLS, BLACK, WHITE
+from .piece import Piece
+from .move import Move
+from .pathfinding import shortest_path_edges, timed
+from .zobrist import PIECE_KEYS, wall_key, position_key
+from .tables import NUM_CELLS, NUM_SLOTS, SLOT_WALLS, SLOT_EDGES, cell_index
+from . import tables
+
+# Cells are indexed row * COLS + col, so every board set is a single integer bitmask
+FULL_MASK = (1 << NUM_CELLS) - 1
+ALL_SLOTS_MASK = (1 << NUM_SLOTS) - 1
+
+BLACK_GOAL_MASK = sum(1 << ((ROWS - 1) * COLS + col) for col in range(COLS))
+WHITE_GOAL_MASK = sum(1 << col for col in range(COLS))
+
+# The shared slot tables as bitmasks: the slots a wall uses up (itself and those it overlaps or crosses)
+# and the squares it blocks moving down or right out of
+SLOT_CONFLICTS = [(1 << slot) | sum(1 << other for other in tables.SLOT_CONFLICTS[slot]) for slot in range(NUM_SLOTS)]
+SLOT_DOWN_EDGES = [sum(1 << edge for edge in edges if edge < NUM_CELLS) for edges in SLOT_EDGES]
+SLOT_RIGHT_EDGES = [sum(1 << (edge - NUM_CELLS) for edge in edges if edge >= NUM_CELLS) for edges in SLOT_EDGES]
+SLOT_KEYS = [wall_key(wall) for wall in SLOT_WALLS]
+CELL_KEYS = {color: [PIECE_KEYS[color][row][col] for row in range(ROWS) for col in range(COLS)] for color in (BLACK, WHITE)}
+
+# The board edges are treated as permanently blocked so shifts never wrap around rows or off the board
+BORDER_DOWN = sum(1 << cell_index(ROWS - 1, col) for col in range(COLS))
+BORDER_RIGHT = sum(1 << cell_index(row, COLS - 1) for row in range(ROWS))
+
+# The columns set in every possible row of a board mask
+ROW_MASK = (1 << COLS) - 1
+ROW_COLUMNS = [tuple(col for col in range(COLS) if (bits >> col) & 1) for bits in range(1 << COLS)]
+
+# For every square, the wall coordinates that count towards the proximity bonus of a pawn there
+NEAR_WALL_COORDS = [
+    sum(1 << cell_index(r, c)
+        for r in range(max(0, row - 1), min(ROWS, row + 2))
+        for c in range(max(0, col - 1), min(COLS, col + 2)))
+    for row in range(ROWS) for col in range(COLS)
+]
+
+
+# Path length counting the starting square from a distance to the goal. A goal that cannot be reached
+# (only possible when walls were placed without checking them) counts as longer than any real path
+def path_length(distance):
+    return NUM_CELLS + 1 if distance is None else distance + 1
+
+
+# Read-only view of blocked edges stored as down and right bitmasks, indexed like tables.NUM_EDGES, so
+# the path helpers shared with Board can read them without building a list of every edge
+class BlockedEdges:
+    __slots__ = ("down", "right")
+
+    def __init__(self, down, right):
+        self.down = down
+        self.right = right
+
+    def __getitem__(self, edge):
+        if edge < NUM_CELLS:
+            return (self.down >> edge) & 1
+        return (self.right >> (edge - NUM_CELLS)) & 1
+
+
+class BitBoard:
+    # Compact board core using integer bitmasks, interchangeable with Board in Game and AI
+    EVAL_WEIGHTS = Board.EVAL_WEIGHTS
+    EVAL_NOISE = Board.EVAL_NOISE
+
+    def __init__(self):
+        self.black_pos = cell_index(0, COLS // 2)
+        self.white_pos = cell_index(ROWS - 1, COLS // 2)
+        # Placed walls and the wall slots that are still free to use
+        self.wall_mask = 0
+        self.valid_mask = ALL_SLOTS_MASK
+        # A set bit means the move down (or right) out of that square is blocked
+        self.down_blocked = BORDER_DOWN
+        self.right_blocked = BORDER_RIGHT
+        # Coordinates of placed walls, used for the proximity bonus
+        self.wall_coords = 0
+        self.black_walls = self.white_walls = 10
+        # Zobrist hash of the piece squares and placed walls
+        self.hash = CELL_KEYS[BLACK][self.black_pos] ^ CELL_KEYS[WHITE][self.white_pos]
+        # Snapshots of the state (and distance maps) before each move applied with make_move
+        self.undo_stack = []
+        self._init_caches()
+
+    # One Piece per color kept in step with the pawn squares, so looking up a piece does not allocate,
+    # the distance maps of the current walls by color and the set of free wall slots. These only depend
+    # on the walls, so they are replaced (never modified) when a wall is placed and can be shared by
+    # copies and undo snapshots
+    def _init_caches(self, distance_maps=None, valid_wall_set=None):
+        self.pieces = {BLACK: Piece(*divmod(self.black_pos, COLS), BLACK), WHITE: Piece(*divmod(self.white_pos, COLS), WHITE)}
+        self.distance_maps = {} if distance_maps is None else distance_maps
+        self.valid_wall_set = valid_wall_set
+
+    def copy(self):
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.black_pos = self.black_pos
+        new_board.white_pos = self.white_pos
+        new_board.wall_mask = self.wall_mask
+        new_board.valid_mask = self.valid_mask
+        new_board.down_blocked = self.down_blocked
+        new_board.right_blocked = self.right_blocked
+        new_board.wall_coords = self.wall_coords
+        new_board.black_walls = self.black_walls
+        new_board.white_walls = self.white_walls
+        new_board.hash = self.hash
+        new_board.undo_stack = []
+        new_board._init_caches(self.distance_maps, self.valid_wall_set)
+        return new_board
+
+    # The whole state is a few integers, so undoing a move restores a snapshot
+    def _state(self):
+        return (self.black_pos, self.white_pos, self.wall_mask, self.valid_mask, self.down_blocked,
+                self.right_blocked, self.wall_coords, self.black_walls, self.white_walls, self.hash)
+
+    # The state is already compact, so it is also the serialized form sent to worker processes
+    def serialize(self):
+        return self._state()
+
+    @classmethod
+    def deserialize(cls, state):
+        board = cls.__new__(cls)
+        (board.black_pos, board.white_pos, board.wall_mask, board.valid_mask, board.down_blocked,
+         board.right_blocked, board.wall_coords, board.black_walls, board.white_walls, board.hash) = state
+        board.undo_stack = []
+        board._init_caches()
+        return board
+
+    @property
+    def board(self):
+        grid = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+        for color in (BLACK, WHITE):
+            piece = self.get_piece_by_color(color)
+            grid[piece.row][piece.col] = piece
+        return grid
+
+    @property
+    def horizontal_walls(self):
+        return {(wall.row, wall.col) for wall in self._walls_in(self.wall_mask) if wall.code == HORIZONTAL}
+
+    @property
+    def vertical_walls(self):
+        return {(wall.row, wall.col) for wall in self._walls_in(self.wall_mask) if wall.code == VERTICAL}
+
+    @property
+    def valid_walls(self):
+        if self.valid_wall_set is None:
+            self.valid_wall_set = set(self._walls_in(self.valid_mask))
+        return self.valid_wall_set
+
+    def _walls_in(self, mask):
+        walls = []
+        while mask:
+            low_bit = mask & -mask
+            walls.append(SLOT_WALLS[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return walls
+
+    def move_piece(self, piece, row, col):
+        self._set_position(piece.color, cell_index(row, col))
+        piece.move(row, col)
+
+    def _set_position(self, color, index):
+        keys = CELL_KEYS[color]
+        if color == BLACK:
+            self.hash ^= keys[self.black_pos] ^ keys[index]
+            self.black_pos = index
+        else:
+            self.hash ^= keys[self.white_pos] ^ keys[index]
+            self.white_pos = index
+        self.pieces[color].move(*divmod(index, COLS))
+
+    def place_wall(self, wall):
+        slot = wall.slot
+        self.wall_mask |= 1 << slot
+        # Removes the wall itself and every wall that overlaps or crosses it
+        self.valid_mask &= ~SLOT_CONFLICTS[slot]
+        self.down_blocked |= SLOT_DOWN_EDGES[slot]
+        self.right_blocked |= SLOT_RIGHT_EDGES[slot]
+        self.wall_coords |= 1 << cell_index(wall.row, wall.col)
+        self.hash ^= SLOT_KEYS[slot]
+        self.distance_maps = self._kept_distance_maps(wall)
+        self.valid_wall_set = None
+
+    # Same rule as Board.update_distance_maps: a map stays exact unless the wall blocks a step between
+    # squares whose distances differ by one. The kept maps go in a new dict as the old one may be shared
+    def _kept_distance_maps(self, wall):
+        kept = {}
+        for color, distances in self.distance_maps.items():
+            for (row1, col1), (row2, col2) in wall.blocked_edges():
+                distance1 = distances[row1][col1]
+                distance2 = distances[row2][col2]
+                if distance1 is not None and distance2 is not None and abs(distance1 - distance2) == 1:
+                    break
+            else:
+                kept[color] = distances
+        return kept
+
+    # Key identifying the position with color to move, for transposition tables
+    def zobrist_key(self, color):
+        return position_key(self.hash, self.black_walls, self.white_walls, color)
+
+    # Applies an action (piece move or wall placement) for a player in place and records how to undo it
+    def make_move(self, action, color):
+        self.undo_stack.append((self._state(), self.distance_maps, self.valid_wall_set))
+        if isinstance(action, Wall):
+            self.place_wall(action)
+            if color == BLACK:
+                self.black_walls -= 1
+            else:
+                self.white_walls -= 1
+        else:
+            self._set_position(color, cell_index(action[0], action[1]))
+
+    # Reverses the last action applied with make_move
+    def unmake_move(self):
+        state, self.distance_maps, self.valid_wall_set = self.undo_stack.pop()
+        (self.black_pos, self.white_pos, self.wall_mask, self.valid_mask, self.down_blocked,
+         self.right_blocked, self.wall_coords, self.black_walls, self.white_walls, self.hash) = state
+        self.pieces[BLACK].move(*divmod(self.black_pos, COLS))
+        self.pieces[WHITE].move(*divmod(self.white_pos, COLS))
+
+    def get_piece(self, row, col):
+        index = cell_index(row, col)
+        if index == self.black_pos:
+            return self.pieces[BLACK]
+        if index == self.white_pos:
+            return self.pieces[WHITE]
+        return 0
+
+    def get_piece_by_color(self, color):
+        return self.pieces[color]
+
+    def winner(self):
+        if self.white_pos < COLS:
+            return WHITE
+        if self.black_pos >= (ROWS - 1) * COLS:
+            return BLACK
+        return None
+
+    def is_valid_wall(self, wall):
+        slot = wall.slot
+        # Overlap check is a single bit test
+        if slot is None or not (self.valid_mask >> slot) & 1:
+            return False
+
+        down_blocked = self.down_blocked | SLOT_DOWN_EDGES[slot]
+        right_blocked = self.right_blocked | SLOT_RIGHT_EDGES[slot]
+        return (self._distance(self.black_pos, BLACK_GOAL_MASK, down_blocked, right_blocked) is not None and
+                self._distance(self.white_pos, WHITE_GOAL_MASK, down_blocked, right_blocked) is not None)
+
+    # Same contract as Board.get_legal_walls: only walls crossing a current shortest path need a search
+    def get_legal_walls(self, walls=None):
+        if walls is None:
+            walls = self.valid_walls
+
+        blocked_edges = BlockedEdges(self.down_blocked, self.right_blocked)
+        path_masks = {}
+        for color, position in ((BLACK, self.black_pos), (WHITE, self.white_pos)):
+            row, col = divmod(position, COLS)
+            edges = shortest_path_edges(blocked_edges, self.get_distance_map(color), row, col)
+            path_masks[color] = (sum(1 << edge for edge in edges if edge < NUM_CELLS),
+                                 sum(1 << (edge - NUM_CELLS) for edge in edges if edge >= NUM_CELLS))
+
+        legal_walls = []
+        for wall in walls:
+            slot = wall.slot
+            if slot is None or not (self.valid_mask >> slot) & 1:
+                continue
+
+            down_blocked = self.down_blocked | SLOT_DOWN_EDGES[slot]
+            right_blocked = self.right_blocked | SLOT_RIGHT_EDGES[slot]
+            for color, position, goal_mask in ((BLACK, self.black_pos, BLACK_GOAL_MASK), (WHITE, self.white_pos, WHITE_GOAL_MASK)):
+                path_down, path_right = path_masks[color]
+                if ((SLOT_DOWN_EDGES[slot] & path_down or SLOT_RIGHT_EDGES[slot] & path_right) and
+                        self._distance(position, goal_mask, down_blocked, right_blocked) is None):
+                    break
+            else:
+                legal_walls.append(wall)
+        return legal_walls
+
+    def get_valid_walls(self):
+        return self.valid_walls
+
+    def is_wall_between(self, row1, col1, row2, col2):
+        if row1 == row2:
+            left = min(col1, col2)
+            return bool((self.right_blocked >> cell_index(row1, left)) & 1)
+        top = min(row1, row2)
+        return bool((self.down_blocked >> cell_index(top, col1)) & 1)
+
+    # Squares reachable in one step from index, ignoring pawns
+    def _steps(self, index):
+        steps = []
+        if not (self.down_blocked >> index) & 1:
+            steps.append((index + COLS, 1, 0))
+        if index >= COLS and not (self.down_blocked >> (index - COLS)) & 1:
+            steps.append((index - COLS, -1, 0))
+        if not (self.right_blocked >> index) & 1:
+            steps.append((index + 1, 0, 1))
+        if index % COLS and not (self.right_blocked >> (index - 1)) & 1:
+            steps.append((index - 1, 0, -1))
+        return steps
+
+    def _step(self, index, d_row, d_col):
+        for target, step_row, step_col in self._steps(index):
+            if step_row == d_row and step_col == d_col:
+                return target
+        return None
+
+    def get_valid_moves(self, piece):
+        moves = set()
+        index = cell_index(piece.row, piece.col)
+        occupied = (1 << self.black_pos) | (1 << self.white_pos)
+
+        for target, d_row, d_col in self._steps(index):
+            # Target is not occupied by a piece
+            if not (occupied >> target) & 1:
+                moves.add(Move(*divmod(target, COLS)))
+                continue
+
+            # Square has opponent, so try to jump straight over them
+            jump = self._step(target, d_row, d_col)
+            if jump is not None and not (occupied >> jump) & 1:
+                moves.add(Move(*divmod(jump, COLS)))
+            # Otherwise move diagonally around them
+            else:
+                for diagonal, _, _ in self._steps(target):
+                    if not (occupied >> diagonal) & 1:
+                        moves.add(Move(*divmod(diagonal, COLS)))
+        return moves
+
+    # Breadth first flood fill over the whole board at once, returns the number of steps to the goal
+    @timed
+    def _distance(self, start, goal_mask, down_blocked=None, right_blocked=None):
+        if down_blocked is None:
+            down_blocked = self.down_blocked
+            right_blocked = self.right_blocked
+        down_open = FULL_MASK & ~down_blocked
+        right_open = FULL_MASK & ~right_blocked
+
+        reached = frontier = 1 << start
+        distance = 0
+        while not frontier & goal_mask:
+            frontier = (((frontier & down_open) << COLS) | ((frontier >> COLS) & down_open) |
+                        ((frontier & right_open) << 1) | ((frontier >> 1) & right_open)) & ~reached
+            if not frontier:
+                return None
+            reached |= frontier
+            distance += 1
+        return distance
+
+    # Number of moves from every square to the goal row of color, None where the goal cannot be reached
+    # Maps are cached until a wall that lengthens a shortest path is placed
+    def get_distance_map(self, color):
+        distances = self.distance_maps.get(color)
+        if distances is None:
+            distances = self.distance_maps[color] = self._distance_map(color)
+        return distances
+
+    # Distance of the pawn of color to its goal, read from the cached map when there is one. Otherwise a
+    # single flood fill from the pawn is much cheaper than building the map, which only move generation needs
+    def _pawn_distance(self, color, row, col):
+        distances = self.distance_maps.get(color)
+        if distances is not None:
+            return distances[row][col]
+        if color == BLACK:
+            return self._distance(self.black_pos, BLACK_GOAL_MASK)
+        return self._distance(self.white_pos, WHITE_GOAL_MASK)
+
+    @timed
+    def _distance_map(self, color):
+        down_open = FULL_MASK & ~self.down_blocked
+        right_open = FULL_MASK & ~self.right_blocked
+        distances = [[None for _ in range(COLS)] for _ in range(ROWS)]
+
+        reached = frontier = BLACK_GOAL_MASK if color == BLACK else WHITE_GOAL_MASK
+        distance = 0
+        while frontier:
+            # The frontier is read a row at a time, ROW_COLUMNS giving the columns of each row's bits
+            squares = frontier
+            row = 0
+            while squares:
+                columns = ROW_COLUMNS[squares & ROW_MASK]
+                if columns:
+                    line = distances[row]
+                    for col in columns:
+                        line[col] = distance
+                squares >>= COLS
+                row += 1
+            frontier = (((frontier & down_open) << COLS) | ((frontier >> COLS) & down_open) |
+                        ((frontier & right_open) << 1) | ((frontier >> 1) & right_open)) & ~reached
+            reached |= frontier
+            distance += 1
+        return distances
+
+    def evaluation_weights(self, color):
+        return self.EVAL_WEIGHTS
+
+    # noise overrides EVAL_NOISE, the size of the random term added to the score (0 for none)
+    def evaluate(self, color, noise=None):
+        black_row, black_col = divmod(self.black_pos, COLS)
+        white_row, white_col = divmod(self.white_pos, COLS)
+        opponent_pos = self.white_pos if color == BLACK else self.black_pos
+
+        winner = self.winner()
+        if winner == color:
+            return 10000
+        if winner is not None:
+            return -10000
+
+        # Path lengths count the starting square, matching Board.evaluate
+        white_path_length = path_length(self._pawn_distance(WHITE, white_row, white_col))
+        black_path_length = path_length(self._pawn_distance(BLACK, black_row, black_col))
+
+        if color == BLACK:
+            path_diff = (1.2 * white_path_length) - (1.8 * black_path_length)
+        else:
+            path_diff = (1.2 * black_path_length) - (1.8 * white_path_length)
+
+        wall_bonus = (self.white_walls - self.black_walls) if color == WHITE else (self.black_walls - self.white_walls)
+
+        proximity_bonus = 2.5 * (self.wall_coords & NEAR_WALL_COORDS[opponent_pos]).bit_count()
+
+        black_progress = black_row
+        white_progress = ROWS - white_row
+
+        if color == WHITE:
+            forward_bonus = white_progress - black_progress
+        else:
+            forward_bonus = black_progress - white_progress
+
+        path_weight, wall_weight, proximity_weight, forward_weight = self.evaluation_weights(color)
+        eval_score = (path_weight * path_diff) + (wall_weight * wall_bonus) + (proximity_weight * proximity_bonus) + (forward_weight * forward_bonus)
+        noise = self.EVAL_NOISE if noise is None else noise
+        if noise:
+            eval_score += random.uniform(0, noise)
+
+        return eval_score
+
+    def __repr__(self):
+        return Board.__repr__(self)
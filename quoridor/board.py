@@ -1,18 +1,36 @@
 import random
-import pygame
 
-from quoridor.wall import Wall
+from quoridor.wall import Wall, HORIZONTAL
 from .constants import *
 from .piece import Piece
-from .pathfinding import path_exists, shortest_path
+from .move import Move
+from .pathfinding import goal_distances, distance_rows, reaches_goal, shortest_path_edges
+from .tables import NUM_EDGES, SLOT_WALLS, SLOT_CONFLICTS, SLOT_EDGES, cell_index, edge_index
+from .zobrist import PIECE_KEYS, wall_key, position_key
 
 class Board:
+    # Weights of the path, wall, proximity and forward features in evaluate,
+    # and the size of the random factor added to every score
+    EVAL_WEIGHTS = (9.17529240734401, 2.3371458286973956, 2.4829408251318736, 0.548062012214623)
+    EVAL_NOISE = 1
+
     def __init__(self):
         self.board = []
         self.horizontal_walls = set()
         self.vertical_walls = set()
         self.valid_walls = set()
+        # Which edges between squares are blocked, indexed by tables.edge_index
+        self.blocked_edges = [False] * NUM_EDGES
         self.black_walls = self.white_walls = 10
+        # Records how to reverse each move applied with make_move
+        self.undo_stack = []
+        # Cached distance to goal from every square per color, kept until a wall cuts a shortest path
+        self.distance_maps = {}
+        # Zobrist hash of the piece squares and placed walls, updated as they change
+        self.hash = 0
+        # The piece of each color and the winner (None while the game is on), kept up to date by move_piece
+        self.pieces = {}
+        self.winner_color = None
         self.create_board()
         self.precompute_valid_walls()
     
@@ -22,141 +40,210 @@ class Board:
             for col in range(COLS):
                 self.board[row].append(0)
 
-        self.board[0][COLS // 2] = Piece(0, COLS // 2, BLACK)
-        self.board[ROWS - 1][COLS // 2] = Piece(ROWS - 1, COLS // 2, WHITE)
+        self.pieces = {BLACK: Piece(0, COLS // 2, BLACK), WHITE: Piece(ROWS - 1, COLS // 2, WHITE)}
+        self.board[0][COLS // 2] = self.pieces[BLACK]
+        self.board[ROWS - 1][COLS // 2] = self.pieces[WHITE]
+        self.hash = PIECE_KEYS[BLACK][0][COLS // 2] ^ PIECE_KEYS[WHITE][ROWS - 1][COLS // 2]
 
     # Precompute all valid wall positions for optimisation
+    # The walls are shared with the slot tables, so boards do not build their own
     def precompute_valid_walls(self):
-        for row in range(ROWS - 1):
-            for col in range(COLS - 1):
-                self.valid_walls.add(Wall(row, col, "horizontal"))
-        
-        for row in range(1, ROWS):
-            for col in range(1, COLS):
-                self.valid_walls.add(Wall(row, col, "vertical"))
-    
-    # Draw the squares of the board
-    def draw_squares(self, win):
-        for row in range(ROWS):
-            for col in range(COLS):
-                if(row + col) % 2 == 0:
-                    pygame.draw.rect(win, BROWN, (row*SQUARE_SIZE, col*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
-                else:
-                    pygame.draw.rect(win, BAIGE, (row*SQUARE_SIZE, col*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
-
-    # Draw the dividers between the squares
-    def draw_dividers(self, win):
-        for row in range(ROWS + 1): 
-            pygame.draw.line(win, GREY, (0, row * SQUARE_SIZE), ((COLS * SQUARE_SIZE), row * SQUARE_SIZE), WALL_THICKNESS)
-        for col in range(COLS + 1):  
-            pygame.draw.line(win, GREY, (col * SQUARE_SIZE, 0), (col * SQUARE_SIZE, (ROWS * SQUARE_SIZE)), WALL_THICKNESS)
-    
-    # Draw placed walls on the board
-    def draw_walls(self, win):
-        for row, col in self.horizontal_walls:
-            start_pos = (col * SQUARE_SIZE + (WALL_THICKNESS // 2) + 1 , (row + 1) * SQUARE_SIZE)
-            end_pos = ((col + 2) * SQUARE_SIZE - (WALL_THICKNESS // 2), (row + 1) * SQUARE_SIZE)
-            pygame.draw.line(win, BLACK, start_pos, end_pos, WALL_THICKNESS)
-        for row, col in self.vertical_walls:
-            start_pos = (col * SQUARE_SIZE, (row - 1) * SQUARE_SIZE + (WALL_THICKNESS // 2) + 1)
-            end_pos = (col  * SQUARE_SIZE, (row + 1) * SQUARE_SIZE - (WALL_THICKNESS // 2))
-            pygame.draw.line(win, BLACK, start_pos, end_pos, WALL_THICKNESS)
-
-    # Draw the number of walls remaining for each player (text)
-    def draw_walls_remaining(self, win):
-        # Somewhat responsive font size
-        font_size = int((HEIGHT - (HEIGHT // RATIO)) // 2)
-        font = pygame.font.SysFont(None, font_size)
-        text = font.render(f"White Walls: {self.white_walls}", True, WHITE)
-        win.blit(text, (0, HEIGHT // RATIO + 5))
-        text = font.render(f"Black Walls: {self.black_walls}", True, BLACK)
-        win.blit(text, (0 , HEIGHT // RATIO + (font_size + 5)))
-    
-    # Calls all draw methods and draws the pieces on the board
-    def draw(self, win):
-        self.draw_squares(win)
-        self.draw_dividers(win)
-        self.draw_walls(win)
-        self.draw_walls_remaining(win)
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board[row][col]
-                if piece:
-                    piece.draw(win)
+        self.valid_walls = set(SLOT_WALLS)
     
     def move_piece(self, piece, row, col):
+        self.hash ^= PIECE_KEYS[piece.color][piece.row][piece.col] ^ PIECE_KEYS[piece.color][row][col]
         self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
         piece.move(row, col)
+        self.update_winner()
+
+    def update_winner(self):
+        if self.pieces[WHITE].row == 0:
+            self.winner_color = WHITE
+        elif self.pieces[BLACK].row == ROWS - 1:
+            self.winner_color = BLACK
+        else:
+            self.winner_color = None
 
     def place_wall(self, wall):
-        if wall.orientation == "horizontal":
+        if wall.code == HORIZONTAL:
             self.horizontal_walls.add((wall.row, wall.col))
         else:
             self.vertical_walls.add((wall.row, wall.col))
-        
-        self.remove_invalid_walls(wall)
+
+        slot = wall.slot
+        for edge in SLOT_EDGES[slot]:
+            self.blocked_edges[edge] = True
+        self.hash ^= wall_key(wall)
+        self.update_distance_maps(wall)
+        return self.remove_invalid_walls(slot)
+
+    # A wall can only lengthen paths if it blocks a step between squares whose distances differ by one,
+    # i.e. a step on some shortest path, otherwise the cached distance map is still exact
+    def update_distance_maps(self, wall):
+        for color, distances in list(self.distance_maps.items()):
+            for (row1, col1), (row2, col2) in wall.blocked_edges():
+                distance1 = distances[row1][col1]
+                distance2 = distances[row2][col2]
+                if distance1 is not None and distance2 is not None and abs(distance1 - distance2) == 1:
+                    del self.distance_maps[color]
+                    break
+
+    def get_distance_map(self, color):
+        distances = self.distance_maps.get(color)
+        if distances is None:
+            distances = distance_rows(goal_distances(self.blocked_edges, color))
+            self.distance_maps[color] = distances
+        return distances
+
+    # Number of squares on the shortest path of piece to its goal, including its own square
+    def shortest_path_length(self, piece):
+        distance = self.get_distance_map(piece.color)[piece.row][piece.col]
+        return None if distance is None else distance + 1
     
     # Given a wall placement we can remove the walls that are invalidated by it (overlapping and crossing   )
-    def remove_invalid_walls(self, wall):
+    # Returns the walls that were removed so the placement can be undone
+    def remove_invalid_walls(self, slot):
+        wall = SLOT_WALLS[slot]
         self.valid_walls.remove(wall)
+        removed = [wall]
+
+        for other in SLOT_CONFLICTS[slot]:
+            neighbour = SLOT_WALLS[other]
+            if neighbour in self.valid_walls:
+                self.valid_walls.remove(neighbour)
+                removed.append(neighbour)
+        return removed
 
-        if wall.orientation == "horizontal":
-            self.valid_walls.discard(Wall(wall.row, wall.col + 1, "horizontal"))
-            self.valid_walls.discard(Wall(wall.row, wall.col - 1, "horizontal"))
-            self.valid_walls.discard(Wall(wall.row + 1, wall.col + 1, "vertical"))
+    # Applies an action (piece move or wall placement) for a player in place and records how to undo it
+    def make_move(self, action, color):
+        if isinstance(action, Wall):
+            # Make sure both maps exist so the new position can inherit any the wall does not cut
+            self.get_distance_map(BLACK)
+            self.get_distance_map(WHITE)
+            distance_maps = dict(self.distance_maps)
+            removed = self.place_wall(action)
+            if color == BLACK:
+                self.black_walls -= 1
+            else:
+                self.white_walls -= 1
+            self.undo_stack.append((action, color, (removed, distance_maps)))
         else:
-            self.valid_walls.discard(Wall(wall.row + 1, wall.col, "vertical"))
-            self.valid_walls.discard(Wall(wall.row - 1, wall.col, "vertical"))
-            self.valid_walls.discard(Wall(wall.row - 1, wall.col - 1, "horizontal"))
+            piece = self.get_piece_by_color(color)
+            self.undo_stack.append((action, color, (piece.row, piece.col)))
+            self.move_piece(piece, action[0], action[1])
+
+    # Reverses the last action applied with make_move
+    def unmake_move(self):
+        action, color, previous = self.undo_stack.pop()
+        if isinstance(action, Wall):
+            removed, self.distance_maps = previous
+            if action.code == HORIZONTAL:
+                self.horizontal_walls.remove((action.row, action.col))
+            else:
+                self.vertical_walls.remove((action.row, action.col))
+            for edge in SLOT_EDGES[action.slot]:
+                self.blocked_edges[edge] = False
+            self.hash ^= wall_key(action)
+            self.valid_walls.update(removed)
+            if color == BLACK:
+                self.black_walls += 1
+            else:
+                self.white_walls += 1
+        else:
+            self.move_piece(self.get_piece(action[0], action[1]), previous[0], previous[1])
+
+    # Compact picklable form of the position, used to send boards to worker processes
+    def serialize(self):
+        black_piece = self.get_piece_by_color(BLACK)
+        white_piece = self.get_piece_by_color(WHITE)
+        return ((black_piece.row, black_piece.col), (white_piece.row, white_piece.col),
+                tuple(sorted(self.horizontal_walls)), tuple(sorted(self.vertical_walls)),
+                self.black_walls, self.white_walls)
+
+    @classmethod
+    def deserialize(cls, state):
+        board = cls()
+        board.load_serialized(state)
+        return board
+
+    # Sets up a new board to match a serialized position
+    def load_serialized(self, state):
+        black_pos, white_pos, horizontal_walls, vertical_walls, self.black_walls, self.white_walls = state
+        self.move_piece(self.get_piece_by_color(BLACK), black_pos[0], black_pos[1])
+        self.move_piece(self.get_piece_by_color(WHITE), white_pos[0], white_pos[1])
+        for row, col in horizontal_walls:
+            self.place_wall(Wall(row, col, "horizontal"))
+        for row, col in vertical_walls:
+            self.place_wall(Wall(row, col, "vertical"))
+
+    # Key identifying the position with color to move, for transposition tables
+    def zobrist_key(self, color):
+        return position_key(self.hash, self.black_walls, self.white_walls, color)
 
     def get_piece(self, row, col):
         return self.board[row][col]
     
     def get_piece_by_color(self, color):
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board[row][col]
-                if piece != 0 and piece.color == color:
-                    return piece
+        return self.pieces[color]
 
     def winner(self):
-        for col in range(COLS):
-            piece = self.board[0][col]
-            if piece != 0 and piece.color == WHITE:
-                return WHITE
-                
-        for col in range(COLS):
-            piece = self.board[ROWS-1][col]
-            if piece != 0 and piece.color == BLACK:
-                return BLACK
-        
-        return None
+        return self.winner_color
     
     def is_valid_wall(self, wall):
         # If not in valid_walls, it is automatically invalid
         if wall not in self.valid_walls:
             return False
-        
-        
-        if wall.orientation == "horizontal":
-            # Temporarily add the wall to check if it blocks the path
-            self.horizontal_walls.add((wall.row, wall.col))
-            # Check path exists for both players
-            if not path_exists(self.board, self.horizontal_walls, self.vertical_walls):
-                self.horizontal_walls.remove((wall.row, wall.col))
-                # If it blocks the path(s) then it's invalid
-                return False
-            self.horizontal_walls.remove((wall.row, wall.col)) 
-        # Same for vertical walls
-        else:  
-            self.vertical_walls.add((wall.row, wall.col))
-            if not path_exists(self.board, self.horizontal_walls, self.vertical_walls):
-                self.vertical_walls.remove((wall.row, wall.col))
-                return False
-            self.vertical_walls.remove((wall.row, wall.col))
 
-        return True
+        # Temporarily block the edges under the wall and check both players can still reach their goal
+        # Walls in valid_walls never share an edge with a placed wall, so the edges can simply be cleared again
+        edges = SLOT_EDGES[wall.slot]
+        for edge in edges:
+            self.blocked_edges[edge] = True
+
+        black_piece = self.get_piece_by_color(BLACK)
+        white_piece = self.get_piece_by_color(WHITE)
+        valid = (reaches_goal(self.blocked_edges, cell_index(black_piece.row, black_piece.col), BLACK) and
+                 reaches_goal(self.blocked_edges, cell_index(white_piece.row, white_piece.col), WHITE))
+
+        for edge in edges:
+            self.blocked_edges[edge] = False
+        return valid
     
+    # Legal walls among walls (all free wall slots by default), in the order given, found in one pass
+    # A wall can only cut a player off if it blocks their current shortest path, so only walls crossing
+    # one of the two paths need a connectivity check, the rest are legal as long as their slot is free
+    def get_legal_walls(self, walls=None):
+        if walls is None:
+            walls = self.valid_walls
+
+        black_piece = self.get_piece_by_color(BLACK)
+        white_piece = self.get_piece_by_color(WHITE)
+        black_cell = cell_index(black_piece.row, black_piece.col)
+        white_cell = cell_index(white_piece.row, white_piece.col)
+        black_path = shortest_path_edges(self.blocked_edges, self.get_distance_map(BLACK), black_piece.row, black_piece.col)
+        white_path = shortest_path_edges(self.blocked_edges, self.get_distance_map(WHITE), white_piece.row, white_piece.col)
+
+        legal_walls = []
+        for wall in walls:
+            if wall not in self.valid_walls:
+                continue
+
+            edges = SLOT_EDGES[wall.slot]
+            cuts_black = not black_path.isdisjoint(edges)
+            cuts_white = not white_path.isdisjoint(edges)
+            if cuts_black or cuts_white:
+                for edge in edges:
+                    self.blocked_edges[edge] = True
+                valid = ((not cuts_black or reaches_goal(self.blocked_edges, black_cell, BLACK)) and
+                         (not cuts_white or reaches_goal(self.blocked_edges, white_cell, WHITE)))
+                for edge in edges:
+                    self.blocked_edges[edge] = False
+                if not valid:
+                    continue
+
+            legal_walls.append(wall)
+        return legal_walls
+
     def get_valid_walls(self):
         return self.valid_walls
 
@@ -179,7 +266,7 @@ class Board:
                     
                     # Target is not occupied by a piece
                     if next_piece == 0:  
-                        moves.add((new_row, new_col))
+                        moves.add(Move(new_row, new_col))
                     # Square has opponent
                     else:  
                         jump_row = new_row + dx
@@ -189,7 +276,7 @@ class Board:
                         if (0 <= jump_row < ROWS and 0 <= jump_col < COLS and # Within bounds
                             not self.is_wall_between(new_row, new_col, jump_row, jump_col) and # No wall between
                             self.get_piece(jump_row, jump_col) == 0): # Target is not occupied by a piece
-                            moves.add((jump_row, jump_col))
+                            moves.add(Move(jump_row, jump_col))
                         # Check diagonal moves if jump blocked
                         else:
                             # Check diagonals
@@ -201,34 +288,25 @@ class Board:
                                 if (0 <= diag_row < ROWS and 0 <= diag_col < COLS and # Within bounds
                                     not self.is_wall_between(new_row, new_col, diag_row, diag_col) and # No wall between
                                     self.get_piece(diag_row, diag_col) == 0): # Target is not occupied by a piece
-                                    moves.add((diag_row, diag_col))
+                                    moves.add(Move(diag_row, diag_col))
         return moves
 
     def is_wall_between(self, row1, col1, row2, col2):
-        # Move is horizontal
-        if row1 == row2:
-            # Move is to right
-            if col1 < col2:
-                return (row2, col2) in self.vertical_walls or (row2 + 1, col2) in self.vertical_walls
-            elif col1 > col2:
-                return (row1, col1) in self.vertical_walls or (row1 + 1, col1) in self.vertical_walls
-        # Move is vertical
-        elif col1 == col2:
-            # Move is downwards
-            if row1 < row2:
-                return (row1, col1) in self.horizontal_walls or (row1, col1 - 1) in self.horizontal_walls
-            # Move is upwards
-            elif row1 > row2:
-                return (row2, col2) in self.horizontal_walls or (row2, col2 - 1) in self.horizontal_walls
-        return False
-
-    def evaluate(self, color):
+        edge = edge_index(row1, col1, row2, col2)
+        return edge is not None and self.blocked_edges[edge]
+
+    # Feature weights used when evaluating for color
+    def evaluation_weights(self, color):
+        return self.EVAL_WEIGHTS
+
+    # noise overrides EVAL_NOISE, the size of the random term added to the score (0 for none)
+    def evaluate(self, color, noise=None):
         white_piece = self.get_piece_by_color(WHITE)
         black_piece = self.get_piece_by_color(BLACK)
         opponent_piece = white_piece if color == BLACK else black_piece
 
-        white_shortest_path = shortest_path(self.horizontal_walls, self.vertical_walls, white_piece)
-        black_shortest_path = shortest_path(self.horizontal_walls, self.vertical_walls, black_piece)
+        white_path_length = self.shortest_path_length(white_piece)
+        black_path_length = self.shortest_path_length(black_piece)
  
         if self.winner() == color:
             return 10000  
@@ -236,9 +314,9 @@ class Board:
             return -10000  
 
         if color == BLACK:
-            path_diff = (1.2 * len(white_shortest_path)) - (1.8 * len(black_shortest_path))
+            path_diff = (1.2 * white_path_length) - (1.8 * black_path_length)
         else:
-            path_diff = (1.2 * len(black_shortest_path)) - (1.8 * len(white_shortest_path))
+            path_diff = (1.2 * black_path_length) - (1.8 * white_path_length)
 
         wall_bonus = (self.white_walls - self.black_walls) if color == WHITE else (self.black_walls - self.white_walls)
 
@@ -255,7 +333,11 @@ class Board:
         else:
             forward_bonus = black_progress - white_progress  
 
-        eval_score = (9.17529240734401 * path_diff) + (2.3371458286973956 * wall_bonus) + (2.4829408251318736 * proximity_bonus) + (0.548062012214623 * forward_bonus) + random.uniform(0,1)
+        path_weight, wall_weight, proximity_weight, forward_weight = self.evaluation_weights(color)
+        eval_score = (path_weight * path_diff) + (wall_weight * wall_bonus) + (proximity_weight * proximity_bonus) + (forward_weight * forward_bonus)
+        noise = self.EVAL_NOISE if noise is None else noise
+        if noise:
+            eval_score += random.uniform(0, noise)
         #Features:
         # 1. Path length difference - difference between the lengths of the shortest paths for both players
         # 2. Wall bonus - difference in the number of walls remaining for both players
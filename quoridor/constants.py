@@ -9,6 +9,11 @@ SQUARE_SIZE = (WIDTH // COLS) / RATIO
 
 FPS = 60
 
+# Seconds the AI may think per move
+AI_TIME_LIMIT = 2
+# Print the statistics of every AI search (nodes, cutoffs, time in move generation, path finding and evaluation)
+LOG_SEARCH_STATS = False
+
 BAIGE = (240,217,181)
 BROWN = (181,136,99)
 WHITE = (255, 255, 255)
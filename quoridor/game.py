@@ -1,5 +1,3 @@
-import pygame
-
 from quoridor.wall import Wall
 from .board import Board
 from .constants import *
@@ -21,15 +19,9 @@ class Game:
 
     # Used to update the window rendering
     def update(self):
-        self.board.draw(self.win)
-        # Draws the valid moves for the selected piece
-        if self.selected_piece:
-            self.draw_valid_moves()
-        # Draws if a wall can be placed in the divider hovered over by the player
-        if self.wall_hovered and self.board.is_valid_wall(self.wall_hovered) and self.player_has_walls():
-            self.draw_hovered_wall()
-            
-        pygame.display.update()
+        # Imported here so games run without a window (training, tests) never load pygame
+        from . import view
+        view.draw_game(self.win, self)
     
     def reset(self):
         self._init()
@@ -102,26 +94,20 @@ class Game:
         else:
             self.turn = BLACK
 
-    def draw_valid_moves(self):
-        for move in self.valid_moves:
-            row, col = move
-            pygame.draw.circle(self.win, YELLOW, (col * SQUARE_SIZE + SQUARE_SIZE // 2, row * SQUARE_SIZE + SQUARE_SIZE // 2), 15)
-
-    def draw_hovered_wall(self):
-        wall = self.wall_hovered
-
-        if wall.orientation == "horizontal":
-            start_pos = (wall.col * SQUARE_SIZE + (WALL_THICKNESS // 2) + 1 , (wall.row + 1) * SQUARE_SIZE)
-            end_pos = ((wall.col + 2) * SQUARE_SIZE - (WALL_THICKNESS // 2), (wall.row + 1) * SQUARE_SIZE)
+    def ai_move(self, move):
+        # AI can give either the action it chose (piece move or wall) or the board state after it
+        # Game moves are never taken back, so they are applied directly rather than with make_move,
+        # which would keep an undo record of every move of the game
+        if isinstance(move, Wall):
+            self.board.place_wall(move)
+            if self.turn == BLACK:
+                self.board.black_walls -= 1
+            else:
+                self.board.white_walls -= 1
+        elif isinstance(move, tuple):
+            self.board.move_piece(self.board.get_piece_by_color(self.turn), move[0], move[1])
         else:
-            start_pos = (wall.col * SQUARE_SIZE, (wall.row - 1) * SQUARE_SIZE + (WALL_THICKNESS // 2) + 1)
-            end_pos = (wall.col * SQUARE_SIZE, (wall.row + 1) * SQUARE_SIZE - (WALL_THICKNESS // 2))
-        
-        pygame.draw.line(self.win, RED, start_pos, end_pos, WALL_THICKNESS)
-    
-    def ai_move(self, board):
-        # Update board state to one evaluated best by AI
-        self.board = board
+            self.board = move
         self.change_turn()
 
     def print_move(self, move):
@@ -0,0 +1,30 @@
+from collections import namedtuple
+
+from quoridor.wall import Wall
+from .constants import COLS, BLACK
+from .tables import NUM_CELLS, SLOT_WALLS
+
+# A piece move to (row, col). Being a tuple, it compares and hashes equal to a plain (row, col)
+Move = namedtuple("Move", ["row", "col"])
+
+
+# Packs an action (piece move or wall) into a single int: squares 0-80 for piece moves,
+# then one code per wall slot. Used to send actions between processes and store them compactly
+def encode_action(action):
+    if isinstance(action, tuple):
+        return action[0] * COLS + action[1]
+    return NUM_CELLS + action.slot
+
+
+def decode_action(code):
+    if code < NUM_CELLS:
+        return Move(*divmod(code, COLS))
+    return SLOT_WALLS[code - NUM_CELLS]
+
+
+# Whether color can play action on board, for actions that come from a table or file rather than move generation
+def is_legal_action(board, action, color):
+    if isinstance(action, Wall):
+        walls_left = board.black_walls if color == BLACK else board.white_walls
+        return walls_left > 0 and board.is_valid_wall(action)
+    return action in board.get_valid_moves(board.get_piece_by_color(color))
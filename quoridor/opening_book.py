@@ -0,0 +1,134 @@
+import argparse
+import os
+import random
+import struct
+
+from .ai import AI
+from .board import Board
+from .constants import WHITE
+from .move import encode_action, decode_action, is_legal_action
+
+# Opening book: the move a deeper search chose for positions seen early in self-play games, keyed by
+# the zobrist key of the position (including side to move and walls left), so the AI can play them instantly
+
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+# File layout: a header with the record count, then one record per position sorted by key
+# (key, packed action, search depth, value for the side to move)
+_MAGIC = b"QBK1"
+_HEADER = struct.Struct("<4sI")
+_RECORD = struct.Struct("<QHBf")
+
+
+class OpeningBook:
+    def __init__(self, entries=None):
+        # key -> (packed action, depth, value)
+        self.entries = {} if entries is None else entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def add(self, key, action, depth, value):
+        # Keep the result of the deepest search if a position is added twice
+        existing = self.entries.get(key)
+        if existing is None or depth >= existing[1]:
+            self.entries[key] = (encode_action(action), depth, value)
+
+    # Returns (value, action) for color to move on board, or None if the position is not in the book
+    # The action is checked against the board so a key collision can never play an illegal move
+    def lookup(self, board, color):
+        entry = self.entries.get(board.zobrist_key(color))
+        if entry is None:
+            return None
+
+        code, _, value = entry
+        action = decode_action(code)
+        if not is_legal_action(board, action, color):
+            return None
+        return value, action
+
+    def save(self, path=DEFAULT_BOOK_PATH):
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, len(self.entries)))
+            for key in sorted(self.entries):
+                code, depth, value = self.entries[key]
+                file.write(_RECORD.pack(key, code, depth, value))
+
+    @classmethod
+    def load(cls, path=DEFAULT_BOOK_PATH):
+        with open(path, "rb") as file:
+            data = file.read()
+
+        magic, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not an opening book")
+
+        entries = {}
+        for key, code, depth, value in _RECORD.iter_unpack(data[_HEADER.size:_HEADER.size + count * _RECORD.size]):
+            entries[key] = (code, depth, value)
+        return cls(entries)
+
+
+# The book at path, or None if it has not been built
+def load_opening_book(path=DEFAULT_BOOK_PATH):
+    if not os.path.exists(path):
+        return None
+    return OpeningBook.load(path)
+
+
+# Plays games self-play games from the start position, searching every position in the first plies plies
+# to depth and storing the chosen move. To cover more than one line, a random action is played instead of
+# the book move with probability explore. The searches are deterministic and break ties with seed, so the
+# same arguments always build the same book
+def build_opening_book(plies=6, depth=4, games=10, explore=0.3, seed=0, book=None, progress=print):
+    rng = random.Random(seed)
+    book = OpeningBook() if book is None else book
+    ai = AI(depth=depth, deterministic=True, seed=seed)
+
+    for game in range(games):
+        board = Board()
+        color = WHITE
+        for ply in range(plies):
+            if board.winner() is not None:
+                break
+
+            key = board.zobrist_key(color)
+            if key in book:
+                action = decode_action(book.entries[key][0])
+            else:
+                value, action = ai.search(board, color, max_depth=depth)
+                book.add(key, action, depth, value)
+
+            if rng.random() < explore:
+                action = rng.choice(ai.get_all_actions(board, color))
+            board.make_move(action, color)
+            color = ai.opposite_color(color)
+
+        if progress:
+            progress(f"Game {game + 1}/{games}: {len(book)} positions")
+
+    return book
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the opening book from self-play games")
+    parser.add_argument("--plies", type=int, default=6, help="number of plies from the start to store")
+    parser.add_argument("--depth", type=int, default=4, help="search depth used for book moves")
+    parser.add_argument("--games", type=int, default=10, help="number of self-play games")
+    parser.add_argument("--explore", type=float, default=0.3, help="chance of playing a random move instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_BOOK_PATH)
+    parser.add_argument("--extend", action="store_true", help="add to the existing book instead of replacing it")
+    args = parser.parse_args()
+
+    book = load_opening_book(args.output) if args.extend else None
+    book = build_opening_book(args.plies, args.depth, args.games, args.explore, args.seed, book)
+    book.save(args.output)
+    print(f"Saved {len(book)} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
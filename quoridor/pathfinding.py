@@ -1,40 +1,143 @@
-from pathfinding.core.grid import Grid
-from pathfinding.finder.bi_a_star import BiAStarFinder
+import threading
+import time
+from contextlib import contextmanager
+
+from pathfinding.core.grid import Grid, GridNode
 from pathfinding.core.diagonal_movement import DiagonalMovement
 
 from .constants import ROWS, COLS, BLACK, WHITE
+from .tables import NUM_CELLS, NUM_EDGES, SLOT_EDGES, NEIGHBOURS, NEIGHBOURS_TOWARDS_GOAL, GOAL_CELLS, cell_index, wall_slot
 
 grid = [[0 for _ in range(COLS)] for _ in range(ROWS)]
 
+# Statistics (anything with a pathfinding_time attribute, e.g. a SearchStats) the path searches add their
+# time to, set by timing_path_searches. Kept per thread, so path searches made by the interface while a
+# search runs on a background thread are not counted. None when nothing is collecting
+path_timer = threading.local()
+path_timer.stats = None
+
+
+# Adds the seconds spent in the path search func to the current thread's path_timer while one is set
+def timed(func):
+    def timed_func(*args, **kwargs):
+        stats = getattr(path_timer, "stats", None)
+        if stats is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.pathfinding_time += time.perf_counter() - start
+
+    timed_func.__name__ = func.__name__
+    timed_func.__wrapped__ = func
+    return timed_func
+
+
+# Path searches made by this thread inside the with block add their time to stats.pathfinding_time
+@contextmanager
+def timing_path_searches(stats):
+    previous = getattr(path_timer, "stats", None)
+    path_timer.stats = stats
+    try:
+        yield stats
+    finally:
+        path_timer.stats = previous
+
 class QuoridorGrid(Grid):
     def __init__(self, *args, horizontal_walls, vertical_walls, **kwargs):
         super().__init__(*args, **kwargs)
         self.horizontal_walls = horizontal_walls
-        self.vertical_walls = vertical_walls 
-    
+        self.vertical_walls = vertical_walls
+        self.blocked_edges = blocked_edges_from_walls(horizontal_walls, vertical_walls)
+
     def neighbors(self, node, diagonal_movement=DiagonalMovement.never):
-        x, y = node.x, node.y
-        
         # The grid coordinates are (x, y) where x is the column and y is the row
-        board_row, board_col = y , x
-
-        neighbors = []
-
-        # upwards neighbours 
-        if board_row > 0 and (board_row - 1, board_col) not in self.horizontal_walls and (board_row - 1, board_col - 1) not in self.horizontal_walls:
-            neighbors.append(self.node(x, y - 1))
-        # downwards neighbours
-        if board_row < self.height - 1 and (board_row, board_col) not in self.horizontal_walls and (board_row, board_col - 1) not in self.horizontal_walls:
-            neighbors.append(self.node(x, y + 1))
-        # left neighbours
-        if board_col > 0 and (board_row, board_col) not in self.vertical_walls and (board_row + 1, board_col) not in self.vertical_walls:
-            neighbors.append(self.node(x - 1, y))
-        # right neighbours
-        if board_col < self.width - 1 and (board_row, board_col + 1) not in self.vertical_walls and (board_row + 1,  board_col + 1) not in self.vertical_walls:
-            neighbors.append(self.node(x + 1, y))
-
-        return neighbors
-    
+        return [self.node(neighbour % COLS, neighbour // COLS)
+                for neighbour, edge in NEIGHBOURS[cell_index(node.y, node.x)] if not self.blocked_edges[edge]]
+
+
+# Which edges between squares are blocked by the given walls, indexed like tables.NUM_EDGES
+def blocked_edges_from_walls(horizontal_walls, vertical_walls):
+    blocked = [False] * NUM_EDGES
+    for walls, orientation in ((horizontal_walls, "horizontal"), (vertical_walls, "vertical")):
+        for row, col in walls:
+            for edge in SLOT_EDGES[wall_slot(row, col, orientation)]:
+                blocked[edge] = True
+    return blocked
+
+
+# Number of moves from every square (by index) to the goal row of color, using a single reverse BFS
+# from all goal squares. Squares that cannot reach the goal are None
+@timed
+def goal_distances(blocked_edges, color):
+    distances = [None] * NUM_CELLS
+    queue = list(GOAL_CELLS[color])
+    for cell in queue:
+        distances[cell] = 0
+
+    # The queue is extended while it is being iterated, which makes this a breadth first search
+    for cell in queue:
+        distance = distances[cell] + 1
+        for neighbour, edge in NEIGHBOURS[cell]:
+            if distances[neighbour] is None and not blocked_edges[edge]:
+                distances[neighbour] = distance
+                queue.append(neighbour)
+
+    return distances
+
+
+# Depth first search from one square that stops as soon as the goal row of color is reached
+# Steps towards the goal are explored first, so on open boards it heads almost straight there
+@timed
+def reaches_goal(blocked_edges, cell, color):
+    goal_row = ROWS - 1 if color == BLACK else 0
+    neighbours = NEIGHBOURS_TOWARDS_GOAL[color]
+    visited = [False] * NUM_CELLS
+    visited[cell] = True
+    stack = [cell]
+
+    while stack:
+        cell = stack.pop()
+        if cell // COLS == goal_row:
+            return True
+        for neighbour, edge in neighbours[cell]:
+            if not visited[neighbour] and not blocked_edges[edge]:
+                visited[neighbour] = True
+                stack.append(neighbour)
+
+    return False
+
+
+# Edges along one shortest path from (row, col) to the goal, following a distance map given as rows
+# Walls that leave all of these edges open cannot cut the player off. If the goal is unreachable
+# every edge is returned, so each wall has to be checked properly
+def shortest_path_edges(blocked_edges, distances, row, col):
+    if distances[row][col] is None:
+        return set(range(NUM_EDGES))
+
+    edges = set()
+    cell = cell_index(row, col)
+    distance = distances[row][col]
+    while distance > 0:
+        for neighbour, edge in NEIGHBOURS[cell]:
+            if not blocked_edges[edge] and distances[neighbour // COLS][neighbour % COLS] == distance - 1:
+                edges.add(edge)
+                cell = neighbour
+                distance -= 1
+                break
+    return edges
+
+
+# Number of moves from every square to the goal row of color, as rows of the board
+# Squares that cannot reach the goal are None
+def distance_map(horizontal_walls, vertical_walls, color):
+    return distance_rows(goal_distances(blocked_edges_from_walls(horizontal_walls, vertical_walls), color))
+
+
+def distance_rows(distances):
+    return [distances[row * COLS:(row + 1) * COLS] for row in range(ROWS)]
+
 
 def path_exists(board, horizontal_walls, vertical_walls):
     black_pos = None
@@ -47,52 +150,34 @@ def path_exists(board, horizontal_walls, vertical_walls):
                 if piece.color == BLACK:
                     black_pos = (row, col)
                 if piece.color == WHITE:
-                    white_pos = (row, col)  
-    
-    grid_obj = QuoridorGrid(matrix=grid, horizontal_walls=horizontal_walls, vertical_walls=vertical_walls)
-    finder = BiAStarFinder(diagonal_movement=DiagonalMovement.never)
-
-    black_start = grid_obj.node(black_pos[1], black_pos[0])
-    # The goal for black is to reach the last row (ROWS - 1)S
-    black_goal_nodes = [grid_obj.node(x, ROWS - 1) for x in range(COLS)]
-
-    white_start = grid_obj.node(white_pos[1], white_pos[0])
-    # The goal for white is to reach the first row (0)
-    white_goal_nodes = [grid_obj.node(x, 0) for x in range(COLS)]
+                    white_pos = (row, col)
 
-    for goal in black_goal_nodes:
-        if finder.find_path(black_start, goal, grid_obj)[0]:
-            break
-    else:
-        return False
+    blocked = blocked_edges_from_walls(horizontal_walls, vertical_walls)
+    return (reaches_goal(blocked, cell_index(black_pos[0], black_pos[1]), BLACK) and
+            reaches_goal(blocked, cell_index(white_pos[0], white_pos[1]), WHITE))
 
-    for goal in white_goal_nodes:
-        if finder.find_path(white_start, goal, grid_obj)[0]:
-            break
-    else:
-        return False 
 
-    return True
+# Number of squares on the shortest path of piece to its goal (including its own square), or None if blocked
+def shortest_path_length(horizontal_walls, vertical_walls, piece):
+    distance = distance_map(horizontal_walls, vertical_walls, piece.color)[piece.row][piece.col]
+    return None if distance is None else distance + 1
 
 
 def shortest_path(horizontal_walls, vertical_walls, piece):
-    grid_obj = QuoridorGrid(matrix=grid, horizontal_walls=horizontal_walls, vertical_walls=vertical_walls)
-    finder = BiAStarFinder(diagonal_movement=DiagonalMovement.never)
-
-    start = grid_obj.node(piece.col, piece.row)
-    
-    if piece.color == BLACK:
-        goals = [grid_obj.node(x, ROWS - 1) for x in range(COLS)]   
-    else:
-        goals = [grid_obj.node(x, 0) for x in range(COLS)]
-    
-    min_path = None
-    min_path_length = float('inf')
-
-    for goal in goals:
-        path, _ = finder.find_path(start, goal, grid_obj)
-        if path and len(path) < min_path_length:
-            min_path = path
-            min_path_length = len(path)    
-
-    return min_path
\ No newline at end of file
+    blocked = blocked_edges_from_walls(horizontal_walls, vertical_walls)
+    distances = goal_distances(blocked, piece.color)
+    cell = cell_index(piece.row, piece.col)
+
+    if distances[cell] is None:
+        return None
+
+    # Walk downhill through the distance map from the piece to the goal row
+    path = [GridNode(x=piece.col, y=piece.row)]
+    while distances[cell] > 0:
+        for neighbour, edge in NEIGHBOURS[cell]:
+            if not blocked[edge] and distances[neighbour] == distances[cell] - 1:
+                cell = neighbour
+                break
+        path.append(GridNode(x=cell % COLS, y=cell // COLS))
+
+    return path
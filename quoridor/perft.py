@@ -0,0 +1,187 @@
+import argparse
+import time
+
+from quoridor.wall import Wall, HORIZONTAL, VERTICAL
+from .board import Board
+from .bitboard import BitBoard
+from .constants import BLACK, WHITE
+from .move import encode_action
+
+# Perft: counts the legal move sequences of a given length from a position by walking the whole game tree.
+# The counts depend only on the rules, so any board class or move generator must give the same numbers
+# as the reference rules (get_valid_moves, get_valid_walls and is_valid_wall on Board), and the time
+# taken measures how fast move generation is. A won position has no moves, so sequences end there
+
+BOARD_CLASSES = {"board": Board, "bitboard": BitBoard}
+
+
+# All legal walls of the position using the reference rules: every free slot checked with is_valid_wall
+def reference_walls(board):
+    return [wall for wall in board.get_valid_walls() if board.is_valid_wall(wall)]
+
+
+# All legal walls in one pass with get_legal_walls
+def batch_walls(board):
+    return board.get_legal_walls()
+
+
+WALL_GENERATORS = {"reference": reference_walls, "legal_walls": batch_walls}
+
+
+# Every legal action of color, piece moves then walls, in encode_action order so divide output is stable
+def legal_actions(board, color, wall_generator=reference_walls):
+    if board.winner() is not None:
+        return []
+
+    actions = list(board.get_valid_moves(board.get_piece_by_color(color)))
+    walls_left = board.black_walls if color == BLACK else board.white_walls
+    if walls_left > 0:
+        actions.extend(wall_generator(board))
+    actions.sort(key=encode_action)
+    return actions
+
+
+def opposite_color(color):
+    return WHITE if color == BLACK else BLACK
+
+
+# Number of legal move sequences of depth moves from board with color to move
+# The last ply is counted without making the moves
+def perft(board, color, depth, wall_generator=reference_walls):
+    if depth == 0:
+        return 1
+
+    actions = legal_actions(board, color, wall_generator)
+    if depth == 1:
+        return len(actions)
+
+    count = 0
+    for action in actions:
+        board.make_move(action, color)
+        count += perft(board, opposite_color(color), depth - 1, wall_generator)
+        board.unmake_move()
+    return count
+
+
+# Perft split by first move: a list of (action, count), which narrows a disagreement down to one move
+def divide(board, color, depth, wall_generator=reference_walls):
+    counts = []
+    for action in legal_actions(board, color, wall_generator):
+        board.make_move(action, color)
+        counts.append((action, perft(board, opposite_color(color), depth - 1, wall_generator)))
+        board.unmake_move()
+    return counts
+
+
+# Short text for an action: "row,col" for a piece move, "row,col h" or "row,col v" for a wall
+def action_name(action):
+    if isinstance(action, Wall):
+        return f"{action.row},{action.col} {'h' if action.code == HORIZONTAL else 'v'}"
+    return f"{action[0]},{action[1]}"
+
+
+# Reference positions as Board.serialize states, the color to move and the known count at each depth
+# The counts come from the reference rules and were checked against every board class and wall generator
+REFERENCE_POSITIONS = {
+    # Starting position
+    "start": (((0, 4), (8, 4), (), (), 10, 10), WHITE, {1: 131, 2: 16677}),
+    # Pawns face to face, white can jump straight over black
+    "jump": (((4, 4), (5, 4), (), (), 10, 10), WHITE, {1: 132, 2: 16938}),
+    # A wall behind black stops the straight jump, so white goes diagonally around
+    "diagonal": (((4, 4), (5, 4), ((3, 4),), (), 10, 10), WHITE, {1: 129, 2: 15922}),
+    # Black on its own back row, white cannot jump off the board so it steps diagonally onto its goal row
+    "edge jump": (((0, 4), (1, 4), (), (), 10, 10), WHITE, {1: 133, 2: 16679}),
+    # No walls left, only piece moves
+    "race": (((2, 4), (6, 4), (), (), 0, 0), WHITE, {1: 4, 2: 16, 3: 64, 4: 256}),
+    # Twelve walls placed, four left each
+    "walled": (((3, 4), (5, 3),
+                ((1, 0), (5, 2), (5, 7), (7, 3)),
+                ((1, 6), (2, 5), (2, 7), (5, 2), (5, 4), (7, 4), (7, 6), (8, 3)),
+                4, 4), WHITE, {1: 87, 2: 7463}),
+}
+
+
+# A fresh board_class board set up at a Board.serialize state, using only methods every board class has
+def board_from_state(state, board_class=Board):
+    black_pos, white_pos, horizontal_walls, vertical_walls, black_walls, white_walls = state
+    board = board_class()
+    # Park white on a square neither pawn is going to first, so black never lands on top of it
+    spare = next(square for square in ((4, 0), (4, 1), (4, 2)) if square not in (black_pos, white_pos))
+    board.move_piece(board.get_piece_by_color(WHITE), spare[0], spare[1])
+    board.move_piece(board.get_piece_by_color(BLACK), black_pos[0], black_pos[1])
+    board.move_piece(board.get_piece_by_color(WHITE), white_pos[0], white_pos[1])
+    for row, col in horizontal_walls:
+        board.place_wall(Wall(row, col, HORIZONTAL))
+    for row, col in vertical_walls:
+        board.place_wall(Wall(row, col, VERTICAL))
+    board.black_walls = black_walls
+    board.white_walls = white_walls
+    return board
+
+
+# Runs every reference position to max_depth with every board class and wall generator
+# Returns rows of (position, depth, backend, count, expected, seconds), backend being "board/reference" etc
+def check_reference(max_depth=2, board_classes=BOARD_CLASSES, wall_generators=WALL_GENERATORS):
+    rows = []
+    for name, (state, color, counts) in REFERENCE_POSITIONS.items():
+        for depth, expected in counts.items():
+            if depth > max_depth:
+                continue
+            for board_name, board_class in board_classes.items():
+                for generator_name, wall_generator in wall_generators.items():
+                    board = board_from_state(state, board_class)
+                    start = time.perf_counter()
+                    count = perft(board, color, depth, wall_generator)
+                    seconds = time.perf_counter() - start
+                    rows.append((name, depth, f"{board_name}/{generator_name}", count, expected, seconds))
+    return rows
+
+
+def positions_per_second(count, seconds):
+    return count / seconds if seconds > 0 else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count legal move sequences from a position (perft)")
+    parser.add_argument("--position", choices=list(REFERENCE_POSITIONS), default="start")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--board", choices=sorted(BOARD_CLASSES), default="board", help="board implementation")
+    parser.add_argument("--walls", choices=sorted(WALL_GENERATORS), default="reference", help="wall generator")
+    parser.add_argument("--divide", action="store_true", help="show the count below every first move")
+    parser.add_argument("--check", action="store_true",
+                        help="check every reference position up to --depth with every board and wall generator")
+    args = parser.parse_args()
+
+    if args.check:
+        failures = 0
+        for name, depth, backend, count, expected, seconds in check_reference(args.depth):
+            status = "ok" if count == expected else f"FAILED, expected {expected}"
+            failures += count != expected
+            print(f"{name:<10} depth {depth}  {backend:<22}{count:>10}  "
+                  f"{positions_per_second(count, seconds):>12,.0f} positions/sec  {status}")
+        print("All counts match" if not failures else f"{failures} counts do not match")
+        raise SystemExit(1 if failures else 0)
+
+    state, color, counts = REFERENCE_POSITIONS[args.position]
+    board = board_from_state(state, BOARD_CLASSES[args.board])
+    wall_generator = WALL_GENERATORS[args.walls]
+
+    start = time.perf_counter()
+    if args.divide:
+        divided = divide(board, color, args.depth, wall_generator)
+        for action, count in divided:
+            print(f"{action_name(action)}: {count}")
+        total = sum(count for _, count in divided)
+    else:
+        total = perft(board, color, args.depth, wall_generator)
+    seconds = time.perf_counter() - start
+
+    print(f"Total: {total}")
+    if args.depth in counts:
+        print("Matches the reference count" if total == counts[args.depth] else
+              f"Does not match the reference count of {counts[args.depth]}")
+    print(f"{seconds:.3f} s, {positions_per_second(total, seconds):,.0f} positions/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+from collections import OrderedDict, deque
+
+from .constants import ROWS, COLS, BLACK, WHITE
+from .move import Move
+from .pathfinding import blocked_edges_from_walls
+from .tables import NUM_CELLS, edge_index
+
+# Exact solver for races: once neither player has walls left, the walls on the board never change and the
+# position is just the two pawn squares and the side to move, 2 * 81 * 81 states in all. Every state is
+# solved at once by retrograde analysis, working back from the finished games, and the tables are kept
+# per wall layout so the rest of the game is answered by lookups
+
+WIN = 1
+LOSS = -1
+DRAW = 0
+
+# Side to move as an index into the state tables
+TURNS = (WHITE, BLACK)
+
+
+def state_index(turn, white_cell, black_cell):
+    return (turn * NUM_CELLS + white_cell) * NUM_CELLS + black_cell
+
+
+# Squares the pawn on cell can move to with the other pawn on other, following the same rules as
+# Board.get_valid_moves: a step, a straight jump over an adjacent pawn, or a diagonal step around it
+# when the jump is blocked by a wall or the edge of the board
+def pawn_moves(blocked_edges, cell, other):
+    row, col = divmod(cell, COLS)
+    other_row, other_col = divmod(other, COLS)
+    moves = set()
+
+    for d_row, d_col in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+        new_row = row + d_row
+        new_col = col + d_col
+        if not (0 <= new_row < ROWS and 0 <= new_col < COLS) or blocked_edges[edge_index(row, col, new_row, new_col)]:
+            continue
+        if (new_row, new_col) != (other_row, other_col):
+            moves.add(new_row * COLS + new_col)
+            continue
+
+        jump_row = new_row + d_row
+        jump_col = new_col + d_col
+        if 0 <= jump_row < ROWS and 0 <= jump_col < COLS and not blocked_edges[edge_index(new_row, new_col, jump_row, jump_col)]:
+            moves.add(jump_row * COLS + jump_col)
+        else:
+            for diag_row, diag_col in ((new_row, new_col + 1), (new_row, new_col - 1), (new_row + 1, new_col), (new_row - 1, new_col)):
+                if (0 <= diag_row < ROWS and 0 <= diag_col < COLS and (diag_row, diag_col) != (row, col) and
+                        not blocked_edges[edge_index(new_row, new_col, diag_row, diag_col)]):
+                    moves.add(diag_row * COLS + diag_col)
+    return sorted(moves)
+
+
+class RaceTable:
+    # Outcome (WIN, LOSS or DRAW for the side to move) and the number of plies until the game ends with
+    # best play (the winner finishing as fast as it can and the loser holding out as long as it can)
+    # for every state of one wall layout. States neither side can force a win from are draws
+    def __init__(self, blocked_edges):
+        self.blocked_edges = blocked_edges
+        size = 2 * NUM_CELLS * NUM_CELLS
+        self.outcomes = [DRAW] * size
+        self.plies = [0] * size
+        self.solve()
+
+    def solve(self):
+        moves = [None] * (NUM_CELLS * NUM_CELLS)
+        for cell in range(NUM_CELLS):
+            for other in range(NUM_CELLS):
+                if cell != other:
+                    moves[cell * NUM_CELLS + other] = pawn_moves(self.blocked_edges, cell, other)
+
+        size = len(self.outcomes)
+        predecessors = [[] for _ in range(size)]
+        # Children of each state not yet known to be wins for the opponent
+        unresolved = [0] * size
+        solved = deque()
+
+        for white_cell in range(NUM_CELLS):
+            for black_cell in range(NUM_CELLS):
+                if white_cell == black_cell:
+                    continue
+                white_won = white_cell < COLS
+                black_won = black_cell >= (ROWS - 1) * COLS
+                for turn in (0, 1):
+                    state = state_index(turn, white_cell, black_cell)
+                    # The game is over, the player who just moved won
+                    if white_won or black_won:
+                        self.outcomes[state] = LOSS if (white_won if turn == 1 else black_won) else WIN
+                        solved.append(state)
+                        continue
+
+                    if turn == 0:
+                        children = [state_index(1, target, black_cell) for target in moves[white_cell * NUM_CELLS + black_cell]]
+                    else:
+                        children = [state_index(0, white_cell, target) for target in moves[black_cell * NUM_CELLS + white_cell]]
+                    unresolved[state] = len(children)
+                    for child in children:
+                        predecessors[child].append(state)
+
+        # Breadth first from the finished games, so every state is reached first by its fastest win,
+        # and a loss is only settled once its last child (the slowest loss) has been
+        while solved:
+            state = solved.popleft()
+            plies = self.plies[state] + 1
+            if self.outcomes[state] == LOSS:
+                for parent in predecessors[state]:
+                    if self.outcomes[parent] == DRAW and unresolved[parent]:
+                        self.outcomes[parent] = WIN
+                        self.plies[parent] = plies
+                        unresolved[parent] = 0
+                        solved.append(parent)
+            else:
+                for parent in predecessors[state]:
+                    if unresolved[parent]:
+                        unresolved[parent] -= 1
+                        if unresolved[parent] == 0:
+                            self.outcomes[parent] = LOSS
+                            self.plies[parent] = plies
+                            solved.append(parent)
+
+    # (outcome, plies) for color to move with the pawns on white_cell and black_cell
+    def result(self, color, white_cell, black_cell):
+        state = state_index(TURNS.index(color), white_cell, black_cell)
+        return self.outcomes[state], self.plies[state]
+
+    # The move that wins fastest, or loses slowest, for color to move, None in a drawn position
+    def best_move(self, color, white_cell, black_cell):
+        outcome, _ = self.result(color, white_cell, black_cell)
+        if outcome == DRAW:
+            return None
+
+        opponent = BLACK if color == WHITE else WHITE
+        cell, other = (white_cell, black_cell) if color == WHITE else (black_cell, white_cell)
+        best_target = None
+        best_plies = None
+        for target in pawn_moves(self.blocked_edges, cell, other):
+            child = (target, other) if color == WHITE else (other, target)
+            child_outcome, child_plies = self.result(opponent, *child)
+            # Opponent's result after the move, so color wants it lost
+            if child_outcome != -outcome:
+                continue
+            if best_plies is None or (child_plies < best_plies if outcome == WIN else child_plies > best_plies):
+                best_target, best_plies = target, child_plies
+        return Move(*divmod(best_target, COLS))
+
+
+class RaceSolver:
+    # Keeps the tables of the last max_tables wall layouts, one game only ever needs one
+    def __init__(self, max_tables=4):
+        self.max_tables = max_tables
+        self.tables = OrderedDict()
+
+    # Pure races: neither player has a wall left and the game is still on
+    def applies(self, board):
+        return board.black_walls == 0 and board.white_walls == 0 and board.winner() is None
+
+    def table(self, board):
+        key = (frozenset(board.horizontal_walls), frozenset(board.vertical_walls))
+        table = self.tables.get(key)
+        if table is None:
+            table = RaceTable(blocked_edges_from_walls(board.horizontal_walls, board.vertical_walls))
+            self.tables[key] = table
+            if len(self.tables) > self.max_tables:
+                self.tables.popitem(last=False)
+        else:
+            self.tables.move_to_end(key)
+        return table
+
+    # (value, move) for color to move, with the values evaluate gives won and lost games,
+    # or None if the position is not a race or is a draw (left to the search)
+    def solve(self, board, color):
+        if not self.applies(board):
+            return None
+
+        white_piece = board.get_piece_by_color(WHITE)
+        black_piece = board.get_piece_by_color(BLACK)
+        cells = (white_piece.row * COLS + white_piece.col, black_piece.row * COLS + black_piece.col)
+        table = self.table(board)
+        outcome, _ = table.result(color, *cells)
+        if outcome == DRAW:
+            return None
+        return float(10000 * outcome), table.best_move(color, *cells)
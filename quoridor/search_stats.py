@@ -0,0 +1,88 @@
+class SearchStats:
+    # What one search cost: node counts, cutoffs, the walls it generated and threw away, and where the time
+    # went. AI.search fills one in for every search and leaves it in AI.stats
+    # Path search time is also part of the move generation and evaluation times, which call the path searches
+    def __init__(self):
+        # Every node entered, the leaves scored among them, and the nodes whose actions were generated
+        self.nodes = 0
+        self.leaves = 0
+        self.expanded = 0
+        # Actions generated over all expanded nodes, for the average branching factor
+        self.actions = 0
+        # Cutoffs per ply from the root, and how many came from the first action searched
+        self.cutoffs_by_ply = {}
+        self.first_move_cutoffs = 0
+        # Null window tests and aspiration windows that had to be searched again
+        self.researches = 0
+        # Wall candidates left after filter_walls, and the ones the path check rejected
+        self.walls_generated = 0
+        self.walls_rejected = 0
+        # Seconds spent generating and ordering actions, in path searches and in evaluation
+        self.movegen_time = 0.0
+        self.pathfinding_time = 0.0
+        self.evaluation_time = 0.0
+        # Wall clock seconds of the whole search and the deepest iteration completed
+        self.elapsed = 0.0
+        self.depth = 0
+
+    @property
+    def cutoffs(self):
+        return sum(self.cutoffs_by_ply.values())
+
+    def branching_factor(self):
+        return self.actions / self.expanded if self.expanded else 0.0
+
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def walls_rejected_rate(self):
+        return self.walls_rejected / self.walls_generated if self.walls_generated else 0.0
+
+    # Adds the counts and times of another search, e.g. a root move searched by a worker process or the
+    # other moves of a game, keeping the deepest depth reached
+    def merge(self, other):
+        self.nodes += other.nodes
+        self.leaves += other.leaves
+        self.expanded += other.expanded
+        self.actions += other.actions
+        for ply, cutoffs in other.cutoffs_by_ply.items():
+            self.cutoffs_by_ply[ply] = self.cutoffs_by_ply.get(ply, 0) + cutoffs
+        self.first_move_cutoffs += other.first_move_cutoffs
+        self.researches += other.researches
+        self.walls_generated += other.walls_generated
+        self.walls_rejected += other.walls_rejected
+        self.movegen_time += other.movegen_time
+        self.pathfinding_time += other.pathfinding_time
+        self.evaluation_time += other.evaluation_time
+        self.elapsed += other.elapsed
+        self.depth = max(self.depth, other.depth)
+
+    def as_dict(self):
+        return {
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "leaves": self.leaves,
+            "branching_factor": self.branching_factor(),
+            "cutoffs_by_ply": dict(sorted(self.cutoffs_by_ply.items())),
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "researches": self.researches,
+            "walls_generated": self.walls_generated,
+            "walls_rejected": self.walls_rejected,
+            "movegen_time": self.movegen_time,
+            "pathfinding_time": self.pathfinding_time,
+            "evaluation_time": self.evaluation_time,
+            "elapsed": self.elapsed,
+            "nodes_per_second": self.nodes_per_second(),
+        }
+
+    # One line summary for logs
+    def summary(self):
+        cutoffs = ", ".join(f"{ply}: {count}" for ply, count in sorted(self.cutoffs_by_ply.items()))
+        return (f"depth {self.depth}, {self.nodes} nodes ({self.leaves} leaves) in {self.elapsed:.2f}s, "
+                f"{self.nodes_per_second():,.0f} nodes/s, branching {self.branching_factor():.1f}, "
+                f"cutoffs by ply {{{cutoffs}}}, walls {self.walls_generated} generated {self.walls_rejected} rejected, "
+                f"movegen {self.movegen_time:.2f}s, pathfinding {self.pathfinding_time:.2f}s, "
+                f"evaluation {self.evaluation_time:.2f}s")
+
+    def __repr__(self):
+        return f"SearchStats({self.summary()})"
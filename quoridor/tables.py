@@ -0,0 +1,95 @@
+from quoridor.wall import Wall, HORIZONTAL, orientation_code
+from .constants import ROWS, COLS, BLACK, WHITE
+
+# Lookup tables built once at import so the board and pathfinder index lists with integers
+# instead of hashing tuples and Wall objects
+
+# Squares are indexed row * COLS + col
+NUM_CELLS = ROWS * COLS
+
+# Edges between neighbouring squares: edge i is the step down from square i, edge NUM_CELLS + i the step right
+NUM_EDGES = 2 * NUM_CELLS
+
+# Wall slots are indexed 0-63 for horizontal walls and 64-127 for vertical walls
+WALL_ROWS = ROWS - 1
+WALL_COLS = COLS - 1
+VERTICAL_OFFSET = WALL_ROWS * WALL_COLS
+NUM_SLOTS = 2 * VERTICAL_OFFSET
+
+
+def cell_index(row, col):
+    return row * COLS + col
+
+
+# Orientation can be the string or the integer code, as for Wall
+def wall_slot(row, col, orientation):
+    if orientation_code(orientation) == HORIZONTAL:
+        if 0 <= row < WALL_ROWS and 0 <= col < WALL_COLS:
+            return row * WALL_COLS + col
+    elif 1 <= row < ROWS and 1 <= col < COLS:
+        return VERTICAL_OFFSET + (row - 1) * WALL_COLS + (col - 1)
+    return None
+
+
+# Edge crossed when stepping between two neighbouring squares, None if they are not neighbours
+def edge_index(row1, col1, row2, col2):
+    if row1 == row2 and abs(col1 - col2) == 1:
+        return NUM_CELLS + cell_index(row1, min(col1, col2))
+    if col1 == col2 and abs(row1 - row2) == 1:
+        return cell_index(min(row1, row2), col1)
+    return None
+
+
+def _build_slot_tables():
+    walls = []
+    conflicts = []
+    edges = []
+
+    for slot in range(NUM_SLOTS):
+        if slot < VERTICAL_OFFSET:
+            row, col = divmod(slot, WALL_COLS)
+            wall = Wall(row, col, "horizontal")
+            # Overlapping horizontal walls either side and the vertical wall crossing it
+            neighbours = [(row, col - 1, "horizontal"), (row, col + 1, "horizontal"), (row + 1, col + 1, "vertical")]
+        else:
+            row, col = divmod(slot - VERTICAL_OFFSET, WALL_COLS)
+            wall = Wall(row + 1, col + 1, "vertical")
+            # Overlapping vertical walls above and below and the horizontal wall crossing it
+            neighbours = [(row, col + 1, "vertical"), (row + 2, col + 1, "vertical"), (row, col, "horizontal")]
+
+        walls.append(wall)
+        conflicts.append(tuple(other for other in (wall_slot(*neighbour) for neighbour in neighbours) if other is not None))
+        edges.append(tuple(edge_index(*first, *second) for first, second in wall.blocked_edges()))
+
+    return walls, conflicts, edges
+
+
+# The Wall in each slot, the other slots it overlaps or crosses, and the edges it blocks
+SLOT_WALLS, SLOT_CONFLICTS, SLOT_EDGES = _build_slot_tables()
+
+
+def _build_neighbours():
+    neighbours = []
+    for row in range(ROWS):
+        for col in range(COLS):
+            square = []
+            for next_row, next_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if 0 <= next_row < ROWS and 0 <= next_col < COLS:
+                    square.append((cell_index(next_row, next_col), edge_index(row, col, next_row, next_col)))
+            neighbours.append(tuple(square))
+    return neighbours
+
+
+# (neighbouring square, edge between them) for every square
+NEIGHBOURS = _build_neighbours()
+
+# Same neighbours with the step towards the goal row of each color last, for depth first searches
+NEIGHBOURS_TOWARDS_GOAL = {
+    BLACK: [tuple(sorted(square, key=lambda step: step[0] // COLS)) for square in NEIGHBOURS],
+    WHITE: [tuple(sorted(square, key=lambda step: -(step[0] // COLS))) for square in NEIGHBOURS],
+}
+
+GOAL_CELLS = {
+    BLACK: tuple(cell_index(ROWS - 1, col) for col in range(COLS)),
+    WHITE: tuple(cell_index(0, col) for col in range(COLS)),
+}
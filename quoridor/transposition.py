@@ -0,0 +1,49 @@
+# Bound types for stored values
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+class TTEntry:
+    __slots__ = ("key", "depth", "value", "flag", "best_move", "generation")
+
+    def __init__(self, key, depth, value, flag, best_move, generation):
+        self.key = key
+        self.depth = depth
+        self.value = value
+        self.flag = flag
+        self.best_move = best_move
+        self.generation = generation
+
+
+class TranspositionTable:
+    # Fixed number of slots indexed by the low bits of the position key, so memory use is bounded
+    def __init__(self, size=2 ** 16):
+        # Round the size up to a power of two so the slot can be found with a mask
+        self.size = 1 << max(0, size - 1).bit_length()
+        self.mask = self.size - 1
+        self.entries = [None] * self.size
+        self.generation = 0
+
+    def probe(self, key):
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry.key == key:
+            return entry
+        return None
+
+    def store(self, key, depth, value, flag, best_move):
+        index = key & self.mask
+        existing = self.entries[index]
+        # Replace empty slots, entries left over from earlier searches, the same position or shallower results
+        if (existing is None or existing.generation != self.generation or
+                existing.key == key or depth >= existing.depth):
+            self.entries[index] = TTEntry(key, depth, value, flag, best_move, self.generation)
+
+    # Called at the start of every search so entries from older searches can be overwritten first
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.generation = 0
+
+    def __len__(self):
+        return sum(1 for entry in self.entries if entry is not None)
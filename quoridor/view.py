@@ -0,0 +1,104 @@
+import pygame
+
+from .constants import *
+
+# Rendering for the pygame window, kept apart from the rules so the engine never imports pygame
+# Everything here only reads the state of a board (Board or BitBoard) or game
+
+PIECE_PADDING = 20
+PIECE_OUTLINE = 4
+
+
+# Centre of a square in window coordinates
+def square_centre(row, col):
+    return (col * SQUARE_SIZE + SQUARE_SIZE // 2, row * SQUARE_SIZE + SQUARE_SIZE // 2)
+
+
+# Start and end of the line drawn for a wall
+def wall_line(row, col, orientation):
+    if orientation == "horizontal":
+        start_pos = (col * SQUARE_SIZE + (WALL_THICKNESS // 2) + 1 , (row + 1) * SQUARE_SIZE)
+        end_pos = ((col + 2) * SQUARE_SIZE - (WALL_THICKNESS // 2), (row + 1) * SQUARE_SIZE)
+    else:
+        start_pos = (col * SQUARE_SIZE, (row - 1) * SQUARE_SIZE + (WALL_THICKNESS // 2) + 1)
+        end_pos = (col * SQUARE_SIZE, (row + 1) * SQUARE_SIZE - (WALL_THICKNESS // 2))
+    return start_pos, end_pos
+
+
+# Draw the squares of the board
+def draw_squares(win):
+    for row in range(ROWS):
+        for col in range(COLS):
+            if(row + col) % 2 == 0:
+                pygame.draw.rect(win, BROWN, (row*SQUARE_SIZE, col*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+            else:
+                pygame.draw.rect(win, BAIGE, (row*SQUARE_SIZE, col*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+
+
+# Draw the dividers between the squares
+def draw_dividers(win):
+    for row in range(ROWS + 1):
+        pygame.draw.line(win, GREY, (0, row * SQUARE_SIZE), ((COLS * SQUARE_SIZE), row * SQUARE_SIZE), WALL_THICKNESS)
+    for col in range(COLS + 1):
+        pygame.draw.line(win, GREY, (col * SQUARE_SIZE, 0), (col * SQUARE_SIZE, (ROWS * SQUARE_SIZE)), WALL_THICKNESS)
+
+
+# Draw placed walls on the board
+def draw_walls(win, board):
+    for row, col in board.horizontal_walls:
+        start_pos, end_pos = wall_line(row, col, "horizontal")
+        pygame.draw.line(win, BLACK, start_pos, end_pos, WALL_THICKNESS)
+    for row, col in board.vertical_walls:
+        start_pos, end_pos = wall_line(row, col, "vertical")
+        pygame.draw.line(win, BLACK, start_pos, end_pos, WALL_THICKNESS)
+
+
+# Draw the number of walls remaining for each player (text)
+def draw_walls_remaining(win, board):
+    # Somewhat responsive font size
+    font_size = int((HEIGHT - (HEIGHT // RATIO)) // 2)
+    font = pygame.font.SysFont(None, font_size)
+    text = font.render(f"White Walls: {board.white_walls}", True, WHITE)
+    win.blit(text, (0, HEIGHT // RATIO + 5))
+    text = font.render(f"Black Walls: {board.black_walls}", True, BLACK)
+    win.blit(text, (0 , HEIGHT // RATIO + (font_size + 5)))
+
+
+def draw_piece(win, piece):
+    radius = SQUARE_SIZE // 2 - PIECE_PADDING
+    centre = square_centre(piece.row, piece.col)
+    pygame.draw.circle(win, GREY, centre, radius + PIECE_OUTLINE)
+    pygame.draw.circle(win, piece.color, centre, radius)
+
+
+# Calls all draw methods and draws the pieces on the board
+def draw_board(win, board):
+    draw_squares(win)
+    draw_dividers(win)
+    draw_walls(win, board)
+    draw_walls_remaining(win, board)
+    for color in (BLACK, WHITE):
+        draw_piece(win, board.get_piece_by_color(color))
+
+
+def draw_valid_moves(win, valid_moves):
+    for row, col in valid_moves:
+        pygame.draw.circle(win, YELLOW, square_centre(row, col), 15)
+
+
+def draw_hovered_wall(win, wall):
+    start_pos, end_pos = wall_line(wall.row, wall.col, wall.orientation)
+    pygame.draw.line(win, RED, start_pos, end_pos, WALL_THICKNESS)
+
+
+# Draws the board and the current player's selection and hovered wall, then updates the window
+def draw_game(win, game):
+    draw_board(win, game.board)
+    # Draws the valid moves for the selected piece
+    if game.selected_piece:
+        draw_valid_moves(win, game.valid_moves)
+    # Draws if a wall can be placed in the divider hovered over by the player
+    if game.wall_hovered and game.board.is_valid_wall(game.wall_hovered) and game.player_has_walls():
+        draw_hovered_wall(win, game.wall_hovered)
+
+    pygame.display.update()
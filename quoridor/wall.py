@@ -1,18 +1,61 @@
+from .constants import ROWS, COLS
+
+# Integer orientation codes, the strings are still accepted wherever a Wall is built
+HORIZONTAL = 0
+VERTICAL = 1
+ORIENTATIONS = ("horizontal", "vertical")
+
+
+def orientation_code(orientation):
+    if orientation in (HORIZONTAL, VERTICAL):
+        return orientation
+    return ORIENTATIONS.index(orientation)
+
+
 class Wall:
+    # Immutable value type: slots keep instances small and the hash is worked out once,
+    # since walls are looked up in sets and dictionaries at every search node
+    __slots__ = ("row", "col", "code", "slot", "_hash")
+
     def __init__(self, row, col, orientation):
-        self.row = row
-        self.col = col
-        self.orientation = orientation
+        code = orientation_code(orientation)
+        # Index of the wall slot (0-63 horizontal, 64-127 vertical), None for walls off the board
+        if code == HORIZONTAL:
+            slot = row * (COLS - 1) + col if 0 <= row < ROWS - 1 and 0 <= col < COLS - 1 else None
+        else:
+            slot = (ROWS - 1) * (COLS - 1) + (row - 1) * (COLS - 1) + (col - 1) if 1 <= row < ROWS and 1 <= col < COLS else None
+        object.__setattr__(self, "row", row)
+        object.__setattr__(self, "col", col)
+        object.__setattr__(self, "code", code)
+        object.__setattr__(self, "slot", slot)
+        object.__setattr__(self, "_hash", hash((row, col, code)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Wall is immutable")
+
+    # Rebuilt from its constructor arguments when pickled or copied
+    def __reduce__(self):
+        return (Wall, (self.row, self.col, self.code))
+
+    @property
+    def orientation(self):
+        return ORIENTATIONS[self.code]
 
     def __eq__(self, other):
         if isinstance(other, Wall):
-            return (self.row == other.row and 
-                    self.col == other.col and 
-                    self.orientation == other.orientation)
+            return (self.row == other.row and
+                    self.col == other.col and
+                    self.code == other.code)
         return False
-    
+
     def __hash__(self):
-        return hash((self.row, self.col, self.orientation))
-    
+        return self._hash
+
     def __repr__(self):
         return str(self.row) + " " + str(self.col) + " " + str(self.orientation)
+
+    # Pairs of adjacent squares the wall stops pieces moving between
+    def blocked_edges(self):
+        if self.code == HORIZONTAL:
+            return [((self.row, self.col), (self.row + 1, self.col)), ((self.row, self.col + 1), (self.row + 1, self.col + 1))]
+        return [((self.row, self.col - 1), (self.row, self.col)), ((self.row - 1, self.col - 1), (self.row - 1, self.col))]
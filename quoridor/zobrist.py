@@ -0,0 +1,33 @@
+import random
+
+from .constants import ROWS, COLS, BLACK, WHITE
+
+MAX_WALLS = 10
+
+# Fixed seed so every process (and anything stored by key) agrees on the keys
+_rng = random.Random(0x51D0)
+
+def _random_key():
+    return _rng.getrandbits(64)
+
+# One random key per piece square, wall slot, number of walls left and side to move
+PIECE_KEYS = {color: [[_random_key() for _ in range(COLS)] for _ in range(ROWS)] for color in (BLACK, WHITE)}
+
+# Indexed by wall slot, horizontal walls first
+WALL_KEYS = [_random_key() for _ in range(2 * (ROWS - 1) * (COLS - 1))]
+
+WALLS_LEFT_KEYS = {color: [_random_key() for _ in range(MAX_WALLS + 1)] for color in (BLACK, WHITE)}
+SIDE_KEY = _random_key()
+
+
+def wall_key(wall):
+    return WALL_KEYS[wall.slot]
+
+
+# Boards keep the piece and wall part of the hash up to date as moves are made,
+# the walls left and side to move are folded in when a key is needed
+def position_key(board_hash, black_walls, white_walls, color):
+    key = board_hash ^ WALLS_LEFT_KEYS[BLACK][black_walls] ^ WALLS_LEFT_KEYS[WHITE][white_walls]
+    if color == BLACK:
+        key ^= SIDE_KEY
+    return key
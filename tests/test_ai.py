@@ -1,6 +1,11 @@
+import time
 import pytest
-from quoridor.ai import AI 
+from quoridor import ai as ai_module
+from quoridor.ai import AI, search_root_action
+from quoridor.move import Move, encode_action
 from quoridor.board import Board
+from quoridor.bitboard import BitBoard
+from training import TrainingBoard
 from quoridor.constants import BLACK, WHITE, ROWS, COLS
 from quoridor.wall import Wall
 
@@ -84,4 +89,211 @@ def test_partial_deepcopy(ai, board):
     
     for i in range(len(board.board)):
         for j in range(len(board.board[i])):
-            assert new_board.board[i][j] == board.board[i][j]
\ No newline at end of file
+            assert new_board.board[i][j] == board.board[i][j]
+
+def test_negamax_in_place_matches_negamax(ai, board, monkeypatch):
+    monkeypatch.setattr("random.uniform", lambda a, b: 0)
+    value, _, action = ai.negamax(board, 2, float("-inf"), float("inf"), WHITE)
+    in_place_value, in_place_action = ai.negamax_in_place(board, 2, float("-inf"), float("inf"), WHITE)
+
+    assert in_place_value == value
+    assert in_place_action == action
+
+def test_negamax_in_place_restores_board(ai, board):
+    board.place_wall(Wall(6, 3, "horizontal"))
+    horizontal_walls = set(board.horizontal_walls)
+    valid_walls = set(board.valid_walls)
+
+    ai.negamax_in_place(board, 2, float("-inf"), float("inf"), BLACK)
+
+    assert board.horizontal_walls == horizontal_walls
+    assert board.vertical_walls == set()
+    assert board.valid_walls == valid_walls
+    assert board.black_walls == board.white_walls == 10
+    assert board.get_piece_by_color(BLACK).row == 0
+    assert board.get_piece_by_color(WHITE).row == ROWS - 1
+    assert board.undo_stack == []
+
+def test_search_matches_fixed_depth(ai, board, monkeypatch):
+    monkeypatch.setattr("random.uniform", lambda a, b: 0)
+    value, _ = AI(table_size=0).negamax_in_place(board, 2, float("-inf"), float("inf"), WHITE)
+    search_value, action = ai.search(board, WHITE, max_depth=2)
+
+    assert search_value == value
+    assert action is not None
+    assert ai.completed_depth == 2
+
+def test_search_respects_time_limit(board):
+    ai = AI()
+    start = time.perf_counter()
+    value, action = ai.search(board, WHITE, time_limit=0.3)
+    elapsed = time.perf_counter() - start
+
+    assert action is not None
+    assert ai.completed_depth >= 1
+    assert elapsed < 3 # Budget plus the time to finish depth 1 and unwind
+    # The interrupted iteration is fully taken back
+    assert board.undo_stack == []
+    assert board.horizontal_walls == set() and board.vertical_walls == set()
+    assert board.get_piece_by_color(WHITE).row == ROWS - 1
+
+def test_order_moves_puts_first_move_then_advances(ai, board):
+    actions = ai.get_all_actions(board, WHITE)
+    wall = next(action for action in actions if isinstance(action, Wall))
+    ordered = ai.order_moves(board, actions, WHITE, 0, first_move=wall)
+
+    assert ordered[0] == wall
+    assert ordered[1] == (ROWS - 2, COLS // 2) # Only piece move that shortens white's path
+    assert sorted(ordered, key=repr) == sorted(actions, key=repr)
+
+def test_order_moves_ranks_path_blocking_walls(ai, board):
+    ordered = ai.order_moves(board, ai.get_all_actions(board, WHITE), WHITE, 0)
+    walls = [action for action in ordered if isinstance(action, Wall)]
+    # Black walks straight down the middle column, so the first walls block that column
+    assert walls[0].orientation == "horizontal"
+    assert walls[0].col in (COLS // 2 - 1, COLS // 2)
+
+def test_move_ordering_searches_fewer_nodes(monkeypatch):
+    monkeypatch.setattr("random.uniform", lambda a, b: 0)
+    board = BitBoard()
+    for action, color in [((ROWS - 2, COLS // 2), WHITE), ((1, COLS // 2), BLACK), (Wall(5, 3, "horizontal"), WHITE),
+                          ((2, COLS // 2), BLACK), (Wall(2, 4, "vertical"), WHITE)]:
+        board.make_move(action, color)
+
+    unordered = AI(move_ordering=False)
+    ordered = AI()
+    unordered_value, _ = unordered.search(board, BLACK, max_depth=3)
+    ordered_value, _ = ordered.search(board, BLACK, max_depth=3)
+
+    assert ordered_value == unordered_value
+    assert ordered.nodes < unordered.nodes
+    assert 0 < ordered.cutoff_rate() <= 1
+
+def test_pvs_matches_plain_search(monkeypatch):
+    monkeypatch.setattr("random.uniform", lambda a, b: 0)
+    board = BitBoard()
+    for action, color in [((ROWS - 2, COLS // 2), WHITE), ((1, COLS // 2), BLACK), (Wall(5, 3, "horizontal"), WHITE)]:
+        board.make_move(action, color)
+
+    plain = AI()
+    pvs = AI(pvs=True)
+    plain_value, _ = plain.search(board, BLACK, max_depth=3)
+    pvs_value, _ = pvs.search(board, BLACK, max_depth=3)
+
+    # Null window tests only prove bounds, so the value at the root is still exact
+    assert pvs_value == pytest.approx(plain_value)
+    assert pvs.nodes <= plain.nodes
+
+def test_reductions_and_aspiration_search_fewer_nodes(monkeypatch):
+    monkeypatch.setattr("random.uniform", lambda a, b: 0)
+    plain = AI()
+    reduced = AI(pvs=True, late_move_reductions=True, aspiration_window=10.0)
+    _, plain_action = plain.search(Board(), WHITE, max_depth=3)
+    _, reduced_action = reduced.search(Board(), WHITE, max_depth=3)
+
+    assert reduced_action == plain_action
+    assert reduced.nodes < plain.nodes / 2
+
+def test_aspiration_window_falls_back_to_full_window(board, monkeypatch):
+    monkeypatch.setattr("random.uniform", lambda a, b: 0)
+    full_value, _ = AI(table_size=0).negamax_in_place(board, 2, float("-inf"), float("inf"), WHITE)
+    ai = AI(aspiration_window=0.01)
+    # A previous value far from the real one makes the first window fail
+    value, action = ai.search_root(board, 2, WHITE, previous_value=full_value + 100)
+
+    assert value == full_value
+    assert action is not None
+    assert ai.researches == 1
+
+def test_deterministic_evaluation_has_no_random_term(board, monkeypatch):
+    def fail(a, b):
+        raise AssertionError("random term used")
+    board.make_move(Wall(6, 3, "horizontal"), BLACK)
+    value = board.evaluate(WHITE, noise=0)
+    ai = AI(deterministic=True)
+    monkeypatch.setattr("random.uniform", fail)
+
+    assert ai.evaluate(board, WHITE) == value
+    assert ai.evaluate(BitBoard.deserialize(BitBoard().serialize()), WHITE) == BitBoard().evaluate(WHITE, noise=0)
+    ai.search(Board(), WHITE, max_depth=2)
+    assert len(ai.leaf_cache) > 0
+
+def test_deterministic_search_repeats_with_the_same_seed():
+    results = []
+    for _ in range(2):
+        ai = AI(deterministic=True, seed=3)
+        board = Board()
+        # The same AI plays out a few moves, so its generator moves on between searches
+        for color in (WHITE, BLACK, WHITE, BLACK):
+            value, action = ai.search(board, color, max_depth=2)
+            board.make_move(action, color)
+            results.append((value, action))
+    assert results[:4] == results[4:]
+
+def test_seed_breaks_ties_at_the_root(monkeypatch):
+    # With every position scoring the same, every root move is tied
+    monkeypatch.setattr(Board, "evaluate", lambda self, color, noise=None: 0.0)
+    actions = {AI(deterministic=True, seed=seed).search(Board(), WHITE, max_depth=2)[1] for seed in range(8)}
+    plain_actions = {AI().search(Board(), WHITE, max_depth=2)[1] for _ in range(8)}
+
+    assert len(actions) > 1
+    # Without deterministic mode the first of the tied moves is always played
+    assert len(plain_actions) == 1
+
+def test_parallel_search_matches_serial():
+    # TrainingBoard has no random term, so both searches are deterministic
+    board = TrainingBoard([[9.2, 2.3, 2.5, 0.5], [9.2, 2.3, 2.5, 0.5]])
+    board.make_move((ROWS - 2, COLS // 2), WHITE)
+    board.make_move(Wall(ROWS - 3, COLS // 2, "horizontal"), BLACK)
+
+    serial_value, serial_action = AI().search(board, WHITE, max_depth=2)
+    parallel_ai = AI(workers=2)
+    progress = []
+    try:
+        parallel_value, parallel_action = parallel_ai.search(board, WHITE, max_depth=2, progress_callback=progress.append)
+    finally:
+        parallel_ai.close()
+
+    assert parallel_value == pytest.approx(serial_value)
+    assert parallel_action == serial_action
+    assert progress[-1] == 100
+
+def test_parallel_search_tests_later_moves_with_a_null_window():
+    board = TrainingBoard([[9.2, 2.3, 2.5, 0.5], [9.2, 2.3, 2.5, 0.5]])
+    board.make_move((ROWS - 2, COLS // 2), WHITE)
+    board.make_move(Wall(ROWS - 3, COLS // 2, "horizontal"), BLACK)
+
+    serial = AI()
+    serial_value, serial_action = serial.search(board, WHITE, max_depth=3)
+    parallel_ai = AI(workers=2)
+    try:
+        parallel_value, parallel_action = parallel_ai.search(board, WHITE, max_depth=3)
+    finally:
+        parallel_ai.close()
+
+    assert parallel_value == pytest.approx(serial_value)
+    assert parallel_action == serial_action
+    # Full windows for every root move searched several times as many nodes as the serial search
+    assert parallel_ai.nodes < 2 * serial.nodes
+
+def test_serialize_round_trip(board):
+    board.make_move(Wall(3, 3, "horizontal"), WHITE)
+    board.make_move((1, COLS // 2), BLACK)
+    copy = Board.deserialize(board.serialize())
+
+    assert copy.serialize() == board.serialize()
+    assert copy.valid_walls == board.valid_walls
+    assert copy.zobrist_key(WHITE) == board.zobrist_key(WHITE)
+
+def test_worker_table_follows_parent_generation():
+    ai_module._worker_ais.clear()
+    settings = {"depth": 2}
+    state = Board().serialize()
+    action = encode_action(Move(ROWS - 2, COLS // 2))
+    search_root_action(AI, settings, Board, state, action, WHITE, 2, generation=5)
+    worker = ai_module._worker_ais[(AI, tuple(sorted(settings.items())))]
+    assert worker.transposition_table.generation == 5
+
+    search_root_action(AI, settings, Board, state, action, WHITE, 2, generation=6)
+    assert worker.transposition_table.generation == 6
+    ai_module._worker_ais.clear()
@@ -0,0 +1,75 @@
+import time
+import pytest
+from quoridor.ai import AI
+from quoridor.background_search import BackgroundSearch
+from quoridor.wall import Wall
+from quoridor.constants import BLACK, WHITE
+from training import TrainingBoard
+
+WEIGHTS = [[3.0, 1.5, 0.5, 2.0], [1.0, 4.0, 2.0, 0.5]]
+
+@pytest.fixture
+def board():
+    board = TrainingBoard(WEIGHTS)
+    board.make_move(Wall(3, 3, "horizontal"), WHITE)
+    return board
+
+@pytest.fixture
+def searcher():
+    searcher = BackgroundSearch(AI(depth=2))
+    yield searcher
+    searcher.close()
+
+def test_background_result_matches_search(board, searcher):
+    searcher.start(board, WHITE)
+    value, action = searcher.result(timeout=30)
+
+    assert (value, action) == AI(depth=2).search(board, WHITE)
+    assert searcher.progress == 100
+    assert not searcher.running() and not searcher.done()
+
+def test_search_uses_a_copy_of_the_board(board, searcher):
+    before = board.serialize()
+    searcher.start(board, WHITE)
+    board.make_move((1, 4), BLACK)
+    searcher.result(timeout=30)
+    board.unmake_move()
+
+    assert board.serialize() == before
+
+def test_cancel_stops_the_search(board, searcher):
+    future = searcher.start(board, WHITE, max_depth=8)
+    time.sleep(0.1)
+    start = time.perf_counter()
+    searcher.cancel()
+
+    future.result(timeout=5)
+    assert time.perf_counter() - start < 1
+    assert searcher.future is None
+
+def play_and_ponder(board, searcher):
+    searcher.start(board, WHITE)
+    _, move = searcher.result(timeout=30)
+    board.make_move(move, WHITE)
+    assert searcher.ponder(board, WHITE)
+    return searcher.ai.predicted_move(board, BLACK)
+
+def test_ponder_hit_reuses_search(board, searcher):
+    predicted = play_and_ponder(board, searcher)
+    ponder_future = searcher.future
+    board.make_move(predicted, BLACK)
+
+    assert searcher.start(board, WHITE) is ponder_future
+    assert searcher.ponder_hits == 1
+    _, move = searcher.result(timeout=30)
+    assert move in board.get_valid_moves(board.get_piece_by_color(WHITE)) or board.is_valid_wall(move)
+
+def test_ponder_miss_starts_new_search(board, searcher):
+    predicted = play_and_ponder(board, searcher)
+    ponder_future = searcher.future
+    other = next(move for move in board.get_valid_moves(board.get_piece_by_color(BLACK)) if move != predicted)
+    board.make_move(other, BLACK)
+
+    assert searcher.start(board, WHITE) is not ponder_future
+    assert searcher.ponder_misses == 1
+    assert searcher.result(timeout=30)[1] is not None
@@ -0,0 +1,38 @@
+import pytest
+from quoridor.board import Board
+from quoridor.bitboard import BitBoard
+from benchmarks.positions import POSITIONS, load_position
+from benchmarks.run import run_benchmarks, compare, regressions
+
+@pytest.mark.parametrize("name", list(POSITIONS))
+def test_positions_load_on_both_boards(name):
+    board, color = load_position(name, Board)
+    bitboard, _ = load_position(name, BitBoard)
+
+    assert board.winner() is None
+    assert bitboard.zobrist_key(color) == board.zobrist_key(color)
+    state, _ = POSITIONS[name]
+    assert board.serialize() == state
+
+def test_run_benchmarks_reports_every_operation():
+    results = run_benchmarks(positions=["midgame"], max_depth=1, min_time=0.001, progress=None)
+
+    operations = results["operations"]["midgame"]
+    assert set(operations) == {"get_valid_moves", "is_valid_wall", "get_legal_walls", "shortest_path", "evaluate",
+                               "evaluate_cached", "get_all_actions", "get_all_moves"}
+    assert all(rate > 0 for rate in operations.values())
+    assert results["search"]["midgame"]["1"]["nodes"] > 0
+
+def test_compare_flags_slower_results():
+    baseline = {"operations": {"opening": {"evaluate": 1000.0, "get_valid_moves": 1000.0}},
+                "search": {"opening": {"1": {"seconds": 0.1, "nodes": 10, "nodes_per_sec": 100.0}}}}
+    results = {"operations": {"opening": {"evaluate": 500.0, "get_valid_moves": 1100.0}},
+               "search": {"opening": {"1": {"seconds": 0.2, "nodes": 10, "nodes_per_sec": 50.0}}}}
+
+    comparison = {name: ratio for name, _, _, ratio in compare(results, baseline)}
+    assert comparison["opening/evaluate"] == pytest.approx(0.5)
+    assert comparison["opening/get_valid_moves"] == pytest.approx(1.1)
+    assert comparison["opening/search depth 1/seconds"] == pytest.approx(0.5)
+
+    slower = {row[0] for row in regressions(compare(results, baseline), tolerance=0.25)}
+    assert slower == {"opening/evaluate", "opening/search depth 1/seconds", "opening/search depth 1/nodes_per_sec"}
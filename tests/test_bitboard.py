@@ -0,0 +1,160 @@
+import random
+import pytest
+from quoridor.ai import AI
+from quoridor.bitboard import BitBoard
+from quoridor.board import Board
+from quoridor.game import Game
+from quoridor.wall import Wall
+from quoridor.constants import BLACK, WHITE, ROWS, COLS
+
+@pytest.fixture
+def bitboard():
+    return BitBoard()
+
+def all_walls():
+    walls = [Wall(row, col, "horizontal") for row in range(ROWS) for col in range(COLS)]
+    walls += [Wall(row, col, "vertical") for row in range(ROWS + 1) for col in range(COLS + 1)]
+    return walls
+
+def play_random_game(seed, plies=20):
+    # Plays the same random moves on a Board and a BitBoard, yielding both after every ply
+    rng = random.Random(seed)
+    board, bitboard = Board(), BitBoard()
+    color = WHITE
+    for _ in range(plies):
+        if board.winner() is not None:
+            break
+        walls_left = board.white_walls if color == WHITE else board.black_walls
+        legal_walls = [wall for wall in board.get_valid_walls() if board.is_valid_wall(wall)]
+        if walls_left and rng.random() < 0.4 and legal_walls:
+            wall = rng.choice(sorted(legal_walls, key=repr))
+            for b in (board, bitboard):
+                b.place_wall(wall)
+                if color == WHITE:
+                    b.white_walls -= 1
+                else:
+                    b.black_walls -= 1
+        else:
+            move = rng.choice(sorted(board.get_valid_moves(board.get_piece_by_color(color))))
+            for b in (board, bitboard):
+                b.move_piece(b.get_piece_by_color(color), move[0], move[1])
+        color = WHITE if color == BLACK else BLACK
+        yield board, bitboard
+
+def test_initial_setup(bitboard):
+    assert bitboard.get_piece(0, COLS // 2).color == BLACK
+    assert bitboard.get_piece(ROWS - 1, COLS // 2).color == WHITE
+    assert bitboard.black_walls == bitboard.white_walls == 10
+    assert bitboard.valid_walls == Board().valid_walls
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_board_rules(seed, monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda a, b: 0)
+    for board, bitboard in play_random_game(seed):
+        assert bitboard.horizontal_walls == board.horizontal_walls
+        assert bitboard.vertical_walls == board.vertical_walls
+        assert bitboard.valid_walls == board.valid_walls
+        assert bitboard.winner() == board.winner()
+        for color in (BLACK, WHITE):
+            piece = board.get_piece_by_color(color)
+            assert bitboard.get_piece_by_color(color) == piece
+            assert bitboard.get_valid_moves(piece) == board.get_valid_moves(piece)
+            assert bitboard.evaluate(color) == pytest.approx(board.evaluate(color))
+            # Maps kept through the walls placed so far must match ones built from scratch
+            fresh = BitBoard.deserialize(bitboard.serialize())
+            assert bitboard.get_distance_map(color) == fresh.get_distance_map(color)
+        for wall in all_walls():
+            assert bitboard.is_valid_wall(wall) == board.is_valid_wall(wall)
+        legal_walls = sorted(board.get_legal_walls(), key=repr)
+        assert sorted(bitboard.get_legal_walls(), key=repr) == legal_walls
+        assert legal_walls == sorted((wall for wall in board.get_valid_walls() if board.is_valid_wall(wall)), key=repr)
+
+def test_copy_is_independent(bitboard):
+    new_board = bitboard.copy()
+    new_board.place_wall(Wall(1, 1, "horizontal"))
+    new_board.move_piece(new_board.get_piece_by_color(WHITE), ROWS - 2, COLS // 2)
+
+    assert (1, 1) not in bitboard.horizontal_walls
+    assert Wall(1, 1, "horizontal") in bitboard.valid_walls
+    assert bitboard.get_piece_by_color(WHITE).row == ROWS - 1
+
+def test_wall_overlap_removes_conflicting_slots(bitboard):
+    bitboard.place_wall(Wall(1, 1, "horizontal"))
+
+    for row, col, orientation in [(1, 1, "horizontal"), (1, 0, "horizontal"), (1, 2, "horizontal"), (2, 2, "vertical")]:
+        assert not bitboard.is_valid_wall(Wall(row, col, orientation))
+    assert bitboard.is_wall_between(1, 1, 2, 1)
+    assert bitboard.is_wall_between(2, 2, 1, 2)
+
+def test_negamax_on_bitboard(bitboard):
+    ai = AI(depth=2)
+    value, new_board, action = ai.negamax(bitboard, 2, float("-inf"), float("inf"), WHITE)
+
+    assert isinstance(new_board, BitBoard)
+    assert value != float("-inf")
+    assert isinstance(action, tuple) or bitboard.is_valid_wall(action)
+
+def test_game_with_bitboard():
+    game = Game(None)
+    game.board = BitBoard()
+
+    assert game.select_square(ROWS - 1, COLS // 2)
+    assert game.select_square(ROWS - 2, COLS // 2)
+    assert game.board.get_piece(ROWS - 2, COLS // 2).color == WHITE
+    assert game.place_wall(Wall(0, COLS // 2, "horizontal"))
+    assert game.board.black_walls == 9
+    assert not game.place_wall(Wall(0, COLS // 2, "horizontal"))
+
+def test_make_and_unmake_restores_state(bitboard):
+    bitboard.make_move(Wall(2, 3, "vertical"), BLACK)
+    bitboard.make_move((ROWS - 2, COLS // 2), WHITE)
+    assert bitboard.black_walls == 9
+    assert bitboard.get_piece(ROWS - 2, COLS // 2).color == WHITE
+
+    bitboard.unmake_move()
+    bitboard.unmake_move()
+    assert bitboard.vertical_walls == set()
+    assert bitboard.valid_walls == Board().valid_walls
+    assert bitboard.black_walls == 10
+    assert bitboard.get_piece(ROWS - 1, COLS // 2).color == WHITE
+
+def test_serialize_round_trip(bitboard):
+    bitboard.make_move(Wall(3, 3, "horizontal"), WHITE)
+    copy = BitBoard.deserialize(bitboard.serialize())
+
+    assert copy.serialize() == bitboard.serialize()
+    assert copy.horizontal_walls == {(3, 3)}
+
+def test_pieces_are_not_allocated_per_lookup(bitboard):
+    piece = bitboard.get_piece_by_color(WHITE)
+    bitboard.make_move((ROWS - 2, COLS // 2), WHITE)
+
+    assert bitboard.get_piece_by_color(WHITE) is piece
+    assert bitboard.get_piece(ROWS - 2, COLS // 2) is piece
+    assert (piece.row, piece.col) == (ROWS - 2, COLS // 2)
+    bitboard.unmake_move()
+    assert (piece.row, piece.col) == (ROWS - 1, COLS // 2)
+
+def test_distance_maps_are_cached_until_a_wall_cuts_a_shortest_path(bitboard):
+    distances = bitboard.get_distance_map(WHITE)
+    bitboard.make_move((ROWS - 2, COLS // 2), WHITE)
+    assert bitboard.get_distance_map(WHITE) is distances
+
+    # Vertical walls only block sideways steps, which are never on a shortest path on an empty board
+    bitboard.make_move(Wall(2, 2, "vertical"), BLACK)
+    assert bitboard.get_distance_map(WHITE) is distances
+    bitboard.unmake_move()
+
+    bitboard.make_move(Wall(0, 4, "horizontal"), BLACK)
+    assert bitboard.get_distance_map(WHITE) is not distances
+    assert bitboard.get_distance_map(WHITE) == BitBoard.deserialize(bitboard.serialize()).get_distance_map(WHITE)
+    bitboard.unmake_move()
+    assert bitboard.get_distance_map(WHITE) is distances
+
+def test_evaluate_with_unreachable_goal(bitboard):
+    # Block every step down out of the top row, as walls placed without checking them could,
+    # so black can never reach its goal. evaluate still gives a score
+    bitboard.down_blocked |= sum(1 << col for col in range(COLS))
+
+    assert bitboard.get_distance_map(BLACK)[0][COLS // 2] is None
+    assert bitboard.evaluate(WHITE, noise=0) > bitboard.evaluate(BLACK, noise=0)
@@ -1,6 +1,7 @@
 import pytest
 from quoridor.board import Board
 from quoridor.wall import Wall
+from quoridor.tables import SLOT_WALLS, SLOT_CONFLICTS
 from quoridor.constants import BLACK, WHITE, ROWS, COLS
 
 white_start_row = ROWS - 1
@@ -48,17 +49,24 @@ def test_wall_placement(board):
     (WHITE),  
 ])
 def test_winner_detection(board, color):
+    # The winner is tracked as pieces move, so pieces have to be moved through the board
     if color == BLACK:
         black_piece = board.get_piece(0, start_col)
-        board.board[white_start_row][(start_col) + 1] = black_piece
+        board.move_piece(black_piece, white_start_row, (start_col) + 1)
     if color == WHITE:
         white_piece = board.get_piece(white_start_row, start_col)
-        board.board[0][(start_col) + 1] = white_piece
-    board.board[0][start_col] = 0
-    board.board[white_start_row][start_col] = 0 
+        board.move_piece(white_piece, 0, (start_col) + 1)
 
     assert board.winner() == color
 
+def test_winner_cleared_when_move_is_undone(board):
+    board.make_move((0, start_col + 1), WHITE)
+    assert board.winner() == WHITE
+
+    board.unmake_move()
+    assert board.winner() is None
+    assert board.get_piece_by_color(WHITE) is board.get_piece(white_start_row, start_col)
+
 @pytest.mark.parametrize("row,col,expected_moves", [
     (0, start_col, {(1, start_col), (0, start_col - 1), (0, start_col + 1)}),  
     (white_start_row, start_col, {(white_start_row - 1, start_col), (white_start_row, start_col - 1), (white_start_row, start_col + 1)}),  
@@ -91,3 +99,83 @@ def test_is_wall_between(board, row , col, orientation):
 def test_evaluation_function(board):    
     assert isinstance(board.evaluate(WHITE), float)
     assert isinstance(board.evaluate(BLACK), float)
+
+def test_make_and_unmake_wall(board):
+    wall = Wall(1, 1, "horizontal")
+    board.make_move(wall, WHITE)
+
+    assert (1, 1) in board.horizontal_walls
+    assert Wall(1, 2, "horizontal") not in board.valid_walls
+    assert board.white_walls == 9
+
+    board.unmake_move()
+
+    assert board.horizontal_walls == set()
+    assert board.valid_walls == Board().valid_walls
+    assert board.white_walls == 10
+
+def test_make_and_unmake_piece_move(board):
+    board.make_move((1, start_col), BLACK)
+    assert board.get_piece(1, start_col).color == BLACK
+
+    board.unmake_move()
+    assert board.get_piece(0, start_col).color == BLACK
+    assert board.get_piece(1, start_col) == 0
+
+def test_distance_map_reused_after_piece_move(board):
+    distances = board.get_distance_map(WHITE)
+    board.move_piece(board.get_piece_by_color(WHITE), white_start_row - 1, start_col)
+
+    assert board.get_distance_map(WHITE) is distances
+    assert board.shortest_path_length(board.get_piece_by_color(WHITE)) == ROWS - 1
+
+def test_distance_map_kept_for_wall_off_shortest_paths(board):
+    distances = board.get_distance_map(BLACK)
+    # Vertical walls only block sideways steps, which are never on a shortest path on an empty board
+    board.place_wall(Wall(2, 2, "vertical"))
+
+    assert board.get_distance_map(BLACK) is distances
+
+def test_distance_map_recomputed_for_cutting_wall(board):
+    distances = board.get_distance_map(BLACK)
+    board.place_wall(Wall(0, start_col, "horizontal"))
+
+    assert board.get_distance_map(BLACK) is not distances
+    assert board.shortest_path_length(board.get_piece_by_color(BLACK)) == ROWS + 1
+
+def test_distance_maps_restored_by_unmake(board):
+    board.make_move(Wall(0, start_col, "horizontal"), WHITE)
+    assert board.shortest_path_length(board.get_piece_by_color(BLACK)) == ROWS + 1
+
+    board.unmake_move()
+    assert board.shortest_path_length(board.get_piece_by_color(BLACK)) == ROWS
+
+def test_wall_tables_match_wall_geometry():
+    for slot, wall in enumerate(SLOT_WALLS):
+        board = Board()
+        board.place_wall(wall)
+        for (row1, col1), (row2, col2) in wall.blocked_edges():
+            assert board.is_wall_between(row1, col1, row2, col2)
+        assert sum(board.blocked_edges) == 2
+        assert {SLOT_WALLS[other] for other in SLOT_CONFLICTS[slot]} | {wall} == Board().valid_walls - board.valid_walls
+
+def test_unmake_wall_clears_blocked_edges(board):
+    board.make_move(Wall(4, 4, "vertical"), BLACK)
+    board.unmake_move()
+
+    assert not any(board.blocked_edges)
+
+def test_legal_walls_match_is_valid_wall(board):
+    # Box the black piece in on two sides so a wall on the third would seal it off
+    for wall in [Wall(0, 4, "horizontal"), Wall(1, 4, "vertical")]:
+        board.place_wall(wall)
+
+    expected = {wall for wall in board.get_valid_walls() if board.is_valid_wall(wall)}
+    assert set(board.get_legal_walls()) == expected
+    assert Wall(1, 6, "vertical") not in expected
+
+def test_legal_walls_keep_order_and_skip_used_slots(board):
+    board.place_wall(Wall(3, 3, "horizontal"))
+    walls = [Wall(5, 5, "vertical"), Wall(3, 3, "horizontal"), Wall(3, 4, "horizontal"), Wall(2, 2, "horizontal")]
+
+    assert board.get_legal_walls(walls) == [Wall(5, 5, "vertical"), Wall(2, 2, "horizontal")]
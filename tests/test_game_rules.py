@@ -1,3 +1,5 @@
+import subprocess
+import sys
 import pytest
 from quoridor.game import Game
 from quoridor.wall import Wall
@@ -218,4 +220,27 @@ def test_invalid_wall_placement_blocking_path(game, board):
     blocking_wall = Wall(row, col + 2, "vertical")
     result = game.place_wall(blocking_wall)
     assert result is False
-    assert (blocking_wall.row, blocking_wall.col) not in board.vertical_walls 
\ No newline at end of file
+    assert (blocking_wall.row, blocking_wall.col) not in board.vertical_walls 
+
+
+def test_ai_move_applies_action(game, board):
+    game.ai_move(Wall(1, 1, "horizontal"))
+    assert (1, 1) in board.horizontal_walls
+    assert board.white_walls == 9
+    assert game.turn == BLACK
+
+    game.ai_move((1, COLS // 2))
+    assert board.get_piece(1, COLS // 2).color == BLACK
+    assert game.turn == WHITE
+
+
+def test_ai_moves_are_not_kept_for_undo(game, board):
+    game.ai_move(Wall(1, 1, "horizontal"))
+    game.ai_move((1, COLS // 2))
+    assert board.undo_stack == []
+
+
+def test_rules_run_without_pygame():
+    # The engine has to load without pygame so headless games and workers start quickly
+    code = "import sys, quoridor.game, quoridor.ai, quoridor.bitboard; assert 'pygame' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
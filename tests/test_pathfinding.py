@@ -1,6 +1,6 @@
 import pytest
 from pathfinding.core.grid import GridNode 
-from quoridor.pathfinding import QuoridorGrid, path_exists, shortest_path
+from quoridor.pathfinding import QuoridorGrid, path_exists, shortest_path, shortest_path_length, distance_map
 from quoridor.constants import BLACK, WHITE, ROWS, COLS
 from quoridor.board import Board
 from quoridor.wall import Wall
@@ -80,4 +80,32 @@ def test_shortest_path_empty_board(board):
 
     board.place_wall(Wall(black_piece.row, black_piece.col, "horizontal"))
     path = shortest_path(board.horizontal_walls, board.vertical_walls, black_piece)
-    assert len(path) == ROWS + 1
\ No newline at end of file
+    assert len(path) == ROWS + 1
+
+def test_distance_map_empty_board(board):
+    black_distances = distance_map(board.horizontal_walls, board.vertical_walls, BLACK)
+    white_distances = distance_map(board.horizontal_walls, board.vertical_walls, WHITE)
+
+    for row in range(ROWS):
+        for col in range(COLS):
+            assert black_distances[row][col] == ROWS - 1 - row
+            assert white_distances[row][col] == row
+
+def test_distance_map_around_wall(board):
+    board.place_wall(Wall(ROWS - 2, 0, "horizontal"))
+    distances = distance_map(board.horizontal_walls, board.vertical_walls, BLACK)
+
+    assert distances[ROWS - 2][0] == 3 # Has to walk around the wall
+    assert distances[ROWS - 2][2] == 1
+
+def test_shortest_path_matches_length(board):
+    board.place_wall(Wall(4, 3, "horizontal"))
+    board.place_wall(Wall(4, 5, "horizontal"))
+    white_piece = board.get_piece_by_color(WHITE)
+    path = shortest_path(board.horizontal_walls, board.vertical_walls, white_piece)
+
+    assert len(path) == shortest_path_length(board.horizontal_walls, board.vertical_walls, white_piece)
+    assert path[-1].y == 0
+    # Consecutive squares on the path are adjacent
+    for a, b in zip(path, path[1:]):
+        assert abs(a.x - b.x) + abs(a.y - b.y) == 1
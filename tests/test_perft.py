@@ -0,0 +1,54 @@
+import pytest
+from quoridor.board import Board
+from quoridor.bitboard import BitBoard
+from quoridor.wall import Wall
+from quoridor.perft import (perft, divide, legal_actions, action_name, board_from_state, check_reference,
+                            REFERENCE_POSITIONS, BOARD_CLASSES, WALL_GENERATORS, reference_walls, batch_walls)
+from quoridor.constants import WHITE
+
+@pytest.mark.parametrize("name", list(REFERENCE_POSITIONS))
+@pytest.mark.parametrize("board_class", [Board, BitBoard])
+@pytest.mark.parametrize("wall_generator", [reference_walls, batch_walls])
+def test_depth_one_counts(name, board_class, wall_generator):
+    state, color, counts = REFERENCE_POSITIONS[name]
+    board = board_from_state(state, board_class)
+
+    assert perft(board, color, 1, wall_generator) == counts[1]
+
+@pytest.mark.parametrize("name", list(REFERENCE_POSITIONS))
+def test_deeper_counts(name):
+    state, color, counts = REFERENCE_POSITIONS[name]
+    board = board_from_state(state, Board)
+
+    for depth, expected in counts.items():
+        assert perft(board, color, depth, batch_walls) == expected
+    # The board is left as it was
+    assert board.serialize() == state
+
+def test_start_count_by_hand():
+    # 3 piece moves and 128 walls for white. After a piece move black has the same 131 actions. After a wall,
+    # black loses its slot, the slot crossing it and the slots overlapping it (480 slots over all 128 walls),
+    # and the four walls in front of or beside black also take away one of its piece moves
+    expected = 3 * 131 + 128 * 131 - 480 - 4
+    assert perft(Board(), WHITE, 2) == expected == REFERENCE_POSITIONS["start"][2][2]
+
+def test_divide_adds_up_to_perft():
+    state, color, counts = REFERENCE_POSITIONS["diagonal"]
+    divided = divide(board_from_state(state), color, 2)
+
+    assert sum(count for _, count in divided) == counts[2]
+    assert [action for action, _ in divided][:5] == [(4, 3), (4, 5), (5, 3), (5, 5), (6, 4)]
+    assert action_name(divided[0][0]) == "4,3"
+    assert action_name(Wall(3, 4, "horizontal")) == "3,4 h"
+
+def test_won_positions_have_no_moves():
+    board = board_from_state(((8, 4), (4, 4), (), (), 10, 10))
+
+    assert legal_actions(board, WHITE) == []
+    assert perft(board, WHITE, 2) == 0
+
+def test_check_reference_agrees_across_backends():
+    rows = check_reference(max_depth=1)
+
+    assert len(rows) == len(REFERENCE_POSITIONS) * len(BOARD_CLASSES) * len(WALL_GENERATORS)
+    assert all(count == expected for _, _, _, count, expected, _ in rows)
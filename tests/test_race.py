@@ -0,0 +1,100 @@
+import pytest
+from quoridor.ai import AI
+from quoridor.board import Board
+from quoridor.bitboard import BitBoard
+from quoridor.perft import board_from_state, REFERENCE_POSITIONS
+from quoridor.race import RaceSolver, RaceTable, pawn_moves, WIN, LOSS
+from quoridor.pathfinding import blocked_edges_from_walls
+from quoridor.constants import BLACK, WHITE, COLS
+
+# Walls of the walled perft position, with none left for either player
+WALLED = REFERENCE_POSITIONS["walled"][0]
+
+def race_board(black, white, state=WALLED, board_class=Board):
+    return board_from_state((black, white, state[2], state[3], 0, 0), board_class)
+
+@pytest.fixture(scope="module")
+def table():
+    return RaceTable(blocked_edges_from_walls(WALLED[2], WALLED[3]))
+
+def test_pawn_moves_match_board(table):
+    for cell in range(0, 81, 4):
+        for other in range(1, 81, 3):
+            if cell == other:
+                continue
+            board = race_board(divmod(other, COLS), divmod(cell, COLS))
+            expected = sorted(row * COLS + col for row, col in board.get_valid_moves(board.get_piece_by_color(WHITE)))
+            assert pawn_moves(table.blocked_edges, cell, other) == expected
+
+def test_open_race_goes_to_the_side_to_move():
+    solver = RaceSolver()
+    table = solver.table(board_from_state(((2, 4), (6, 4), (), (), 0, 0)))
+
+    # Both need six moves, so white moving first arrives on its sixth move, the eleventh ply
+    assert table.result(WHITE, 6 * COLS + 2, 2 * COLS + 6) == (WIN, 11)
+    assert table.result(BLACK, 6 * COLS + 2, 2 * COLS + 6) == (WIN, 11)
+
+def test_jumps_change_the_race():
+    table = RaceSolver().table(board_from_state(((2, 4), (6, 4), (), (), 0, 0)))
+
+    # On the same file white has to step next to black, and black gains a move by jumping over
+    assert table.result(WHITE, 6 * COLS + 4, 2 * COLS + 4) == (LOSS, 12)
+
+@pytest.mark.parametrize("black, white, color", [((6, 4), (2, 4), WHITE), ((4, 4), (5, 4), WHITE),
+                                                 ((5, 3), (4, 3), BLACK), ((3, 4), (5, 3), WHITE)])
+def test_solver_agrees_with_search(black, white, color):
+    board = race_board(black, white)
+    value, _ = RaceSolver().solve(board, color)
+    search_value, _ = AI(depth=7, solve_races=False).search(board, color)
+
+    if abs(search_value) >= 10000:
+        assert value == search_value
+    else:
+        # The search could not see the end, the solver still knows who wins
+        assert abs(value) == 10000
+
+@pytest.mark.parametrize("board_class", [Board, BitBoard])
+def test_best_moves_play_out_the_predicted_result(board_class):
+    solver = RaceSolver()
+    board = race_board((3, 4), (5, 3), board_class=board_class)
+    color = WHITE
+    white, black = board.get_piece_by_color(WHITE), board.get_piece_by_color(BLACK)
+    outcome, plies = solver.table(board).result(color, white.row * COLS + white.col, black.row * COLS + black.col)
+
+    played = 0
+    while board.winner() is None:
+        _, move = solver.solve(board, color)
+        board.make_move(move, color)
+        color = BLACK if color == WHITE else WHITE
+        played += 1
+
+    assert played == plies
+    assert board.winner() == (WHITE if outcome == WIN else BLACK)
+
+def test_losing_side_holds_out_longest(table):
+    white_cell, black_cell = 4 * COLS + 3, 3 * COLS + 4
+    outcome, plies = table.result(BLACK, white_cell, black_cell)
+    move = table.best_move(BLACK, white_cell, black_cell)
+
+    assert outcome == LOSS
+    assert table.result(WHITE, white_cell, move.row * COLS + move.col) == (WIN, plies - 1)
+    for target in pawn_moves(table.blocked_edges, black_cell, white_cell):
+        assert table.result(WHITE, white_cell, target)[1] <= plies - 1
+
+def test_only_pure_races_are_solved():
+    solver = RaceSolver()
+    board = board_from_state(((2, 4), (6, 4), (), (), 0, 1))
+    assert solver.solve(board, WHITE) is None
+
+    board.white_walls = 0
+    assert solver.solve(board, WHITE) is not None
+    # Tables are kept per wall layout
+    assert len(solver.tables) == 1
+
+def test_ai_plays_races_from_the_solver():
+    board = race_board((3, 4), (5, 3))
+    ai = AI(depth=4)
+
+    value, move = ai.search(board, WHITE)
+    assert ai.nodes == 0
+    assert (value, move) == RaceSolver().solve(board, WHITE)
@@ -0,0 +1,108 @@
+import threading
+import pytest
+from quoridor.ai import AI
+from quoridor.board import Board
+from quoridor.bitboard import BitBoard
+from quoridor.constants import BLACK, WHITE
+from quoridor.pathfinding import timing_path_searches
+from quoridor.search_stats import SearchStats
+from quoridor.wall import Wall
+
+
+def walled_board(board_class=Board):
+    board = board_class()
+    for action, color in [(Wall(6, 3, "horizontal"), WHITE), (Wall(1, 4, "horizontal"), BLACK),
+                          (Wall(6, 5, "horizontal"), WHITE), (Wall(5, 2, "vertical"), BLACK)]:
+        board.make_move(action, color)
+    return board
+
+@pytest.mark.parametrize("board_class", [Board, BitBoard])
+def test_search_fills_in_stats(board_class):
+    ai = AI(deterministic=True, solve_races=False)
+    ai.search(walled_board(board_class), WHITE, max_depth=3)
+    stats = ai.stats
+
+    assert stats.depth == 3
+    assert 0 < stats.leaves < stats.nodes
+    assert stats.expanded + stats.leaves <= stats.nodes
+    assert stats.branching_factor() == stats.actions / stats.expanded
+    assert stats.cutoffs == ai.cutoffs == sum(stats.cutoffs_by_ply.values())
+    assert set(stats.cutoffs_by_ply) <= {0, 1, 2}
+    assert 0 <= stats.walls_rejected <= stats.walls_generated
+    assert stats.movegen_time > 0 and stats.pathfinding_time > 0 and stats.evaluation_time > 0
+    assert stats.movegen_time + stats.evaluation_time <= stats.elapsed
+    assert stats.nodes_per_second() == stats.nodes / stats.elapsed
+
+def test_stats_are_reset_for_each_search():
+    ai = AI(deterministic=True)
+    ai.search(Board(), WHITE, max_depth=3)
+    fresh = AI(deterministic=True)
+    ai.search(Board(), WHITE, max_depth=1)
+    fresh.search(Board(), WHITE, max_depth=1)
+
+    assert ai.stats.depth == 1
+    assert ai.stats.as_dict()["nodes"] == fresh.stats.nodes
+    assert ai.stats.cutoffs_by_ply == fresh.stats.cutoffs_by_ply
+
+def test_walls_cutting_off_a_player_are_counted_as_rejected():
+    board = Board()
+    # Black is boxed in apart from the gap at column 8, closing it would cut black off
+    for col in range(0, 8, 2):
+        board.make_move(Wall(7, col, "horizontal"), WHITE)
+    board.make_move(Wall(6, 7, "vertical"), WHITE)
+    ai = AI()
+    actions = ai.get_all_actions(board, BLACK)
+
+    assert ai.stats.walls_rejected > 0
+    assert ai.stats.walls_generated - ai.stats.walls_rejected == sum(isinstance(action, Wall) for action in actions)
+
+def test_path_searches_are_only_timed_while_collecting():
+    board = Board()
+    stats = SearchStats()
+    board.get_legal_walls()
+    assert stats.pathfinding_time == 0
+
+    with timing_path_searches(stats):
+        board.distance_maps.clear()
+        board.get_legal_walls()
+    assert stats.pathfinding_time > 0
+
+    time_taken = stats.pathfinding_time
+    board.distance_maps.clear()
+    board.get_legal_walls()
+    assert stats.pathfinding_time == time_taken
+
+def test_merge_adds_counts_and_keeps_deepest_depth():
+    first = SearchStats()
+    first.nodes, first.depth, first.cutoffs_by_ply, first.movegen_time = 10, 3, {0: 1, 1: 2}, 0.5
+    second = SearchStats()
+    second.nodes, second.depth, second.cutoffs_by_ply, second.movegen_time = 5, 2, {1: 1, 2: 4}, 0.25
+    first.merge(second)
+
+    assert first.nodes == 15
+    assert first.depth == 3
+    assert first.cutoffs_by_ply == {0: 1, 1: 3, 2: 4}
+    assert first.cutoffs == 8
+    assert first.movegen_time == 0.75
+
+def test_empty_stats_have_no_rates():
+    stats = SearchStats()
+
+    assert stats.branching_factor() == 0
+    assert stats.nodes_per_second() == 0
+    assert stats.walls_rejected_rate() == 0
+    assert "0 nodes" in stats.summary()
+
+def test_path_searches_on_other_threads_are_not_timed():
+    stats = SearchStats()
+    board = Board()
+
+    def other_thread():
+        board.distance_maps.clear()
+        board.get_legal_walls()
+
+    with timing_path_searches(stats):
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join()
+    assert stats.pathfinding_time == 0
@@ -0,0 +1,37 @@
+import numpy as np
+from tournament import play_game, run_tournament
+from quoridor.constants import WHITE
+
+weights_1 = np.array([9.2, 2.3, 2.5, 0.5])
+weights_2 = np.array([3.6, 3.3, 1.4, 0.5])
+
+def test_play_game_stops_at_max_plies():
+    result = play_game(0, weights_1, weights_2, seed=1, max_plies=4)
+
+    assert result.plies == 4
+    assert result.winner is None
+    assert not result.timed_out
+    assert not result.agent_1_won()
+
+def test_play_game_keeps_caller_random_state():
+    np.random.seed(5)
+    expected = np.random.rand()
+    np.random.seed(5)
+    play_game(0, weights_1, weights_2, seed=1, max_plies=1)
+    assert np.random.rand() == expected
+
+def test_tournament_is_reproducible_across_workers():
+    pairings = [(weights_1, weights_2), (weights_2, weights_1)]
+    serial = run_tournament(pairings, workers=1, base_seed=7, max_plies=3)
+    parallel = run_tournament(pairings, workers=2, base_seed=7, max_plies=3)
+
+    assert [result.game_id for result in parallel] == [0, 1]
+    assert [result.seed for result in parallel] == [7, 8]
+    assert [(r.winner, r.plies) for r in parallel] == [(r.winner, r.plies) for r in serial]
+
+def test_play_game_adds_up_search_stats():
+    result = play_game(0, weights_1, weights_2, seed=1, max_plies=2)
+
+    white_stats = result.search_stats[WHITE]
+    assert white_stats.nodes > 0
+    assert white_stats.elapsed > 0
@@ -0,0 +1,49 @@
+import pytest
+from training import TrainingBoard, TrainingAI, FeatureCache
+from quoridor.wall import Wall
+from quoridor.constants import BLACK, WHITE
+
+WEIGHTS = [[3.0, 1.5, 0.5, 2.0], [1.0, 4.0, 2.0, 0.5]]
+
+@pytest.fixture
+def cache():
+    return FeatureCache()
+
+@pytest.fixture
+def board(cache):
+    board = TrainingBoard(WEIGHTS, cache)
+    board.make_move(Wall(6, 3, "horizontal"), WHITE)
+    board.make_move((1, 4), BLACK)
+    return board
+
+def test_cache_evicts_least_recently_used():
+    cache = FeatureCache(max_size=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    cache.put(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a" and cache.get(3) == "c"
+    assert len(cache) == 2
+
+@pytest.mark.parametrize("color", [BLACK, WHITE])
+def test_cached_evaluation_matches_features(board, cache, color):
+    first = board.evaluate(color)
+    second = board.evaluate(color)
+
+    features = board.evaluation_features(color)
+    assert first == second == pytest.approx(sum(w * f for w, f in zip(board.evaluation_weights(color), features)))
+    assert cache.hits == 1
+
+def test_weights_applied_after_lookup(board, cache):
+    other_weights = [[1.0, 1.0, 1.0, 1.0], [1.0, 1.0, 1.0, 1.0]]
+    other = TrainingBoard.deserialize((board.serialize()[0], other_weights))
+    other.feature_cache = cache
+
+    board.evaluate(WHITE)
+    assert other.evaluate(WHITE) == pytest.approx(sum(board.evaluation_features(WHITE)))
+    assert cache.hits == 1
+
+def test_copies_share_the_cache(board, cache):
+    assert TrainingAI().partial_deepcopy(board).feature_cache is cache
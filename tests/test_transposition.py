@@ -0,0 +1,85 @@
+import pytest
+from quoridor.ai import AI
+from quoridor.bitboard import BitBoard
+from quoridor.board import Board
+from quoridor.transposition import TranspositionTable, EXACT, LOWER_BOUND
+from quoridor.wall import Wall
+from quoridor.constants import BLACK, WHITE, ROWS, COLS
+
+@pytest.fixture
+def table():
+    return TranspositionTable(size=16)
+
+def test_store_and_probe(table):
+    table.store(12345, 2, 1.5, EXACT, (1, 4))
+    entry = table.probe(12345)
+
+    assert entry.value == 1.5
+    assert entry.depth == 2
+    assert entry.flag == EXACT
+    assert entry.best_move == (1, 4)
+    assert table.probe(54321) is None
+
+def test_size_is_bounded(table):
+    for key in range(100):
+        table.store(key, 1, 0, EXACT, None)
+    assert len(table) == 16
+
+def test_deeper_entry_kept_in_same_search(table):
+    table.store(1, 3, 1.0, EXACT, None)
+    table.store(1 + 16, 1, 2.0, LOWER_BOUND, None)
+
+    assert table.probe(1).value == 1.0
+    assert table.probe(1 + 16) is None
+
+def test_older_search_entry_replaced(table):
+    table.store(1, 3, 1.0, EXACT, None)
+    table.new_search()
+    table.store(1 + 16, 1, 2.0, EXACT, None)
+
+    assert table.probe(1) is None
+    assert table.probe(1 + 16).value == 2.0
+
+@pytest.mark.parametrize("board_class", [Board, BitBoard])
+def test_hash_independent_of_move_order(board_class):
+    first, second = board_class(), board_class()
+    walls = [Wall(2, 2, "horizontal"), Wall(5, 5, "vertical")]
+
+    first.make_move(walls[0], WHITE)
+    first.make_move(walls[1], WHITE)
+    second.make_move(walls[1], WHITE)
+    second.make_move(walls[0], WHITE)
+
+    assert first.zobrist_key(BLACK) == second.zobrist_key(BLACK)
+    assert first.zobrist_key(BLACK) != first.zobrist_key(WHITE)
+
+@pytest.mark.parametrize("board_class", [Board, BitBoard])
+def test_hash_restored_by_unmake(board_class):
+    board = board_class()
+    key = board.zobrist_key(WHITE)
+
+    board.make_move(Wall(3, 3, "horizontal"), WHITE)
+    board.make_move((1, COLS // 2), BLACK)
+    assert board.zobrist_key(WHITE) != key
+
+    board.unmake_move()
+    board.unmake_move()
+    assert board.zobrist_key(WHITE) == key
+
+def test_walls_left_change_key():
+    board = Board()
+    key = board.zobrist_key(WHITE)
+    board.white_walls -= 1
+    assert board.zobrist_key(WHITE) != key
+
+def test_search_result_unchanged_by_table(monkeypatch):
+    monkeypatch.setattr("random.uniform", lambda a, b: 0)
+    board = BitBoard()
+    board.make_move((ROWS - 2, COLS // 2), WHITE)
+
+    without_table = AI(table_size=0).negamax_in_place(board, 3, float("-inf"), float("inf"), BLACK)
+    ai = AI()
+    with_table = ai.negamax_in_place(board, 3, float("-inf"), float("inf"), BLACK)
+
+    assert with_table == without_table
+    assert len(ai.transposition_table) > 0
@@ -0,0 +1,45 @@
+import pickle
+import pytest
+from quoridor.wall import Wall, HORIZONTAL, VERTICAL
+from quoridor.move import Move, encode_action, decode_action
+from quoridor.tables import SLOT_WALLS, wall_slot
+from quoridor.constants import ROWS, COLS
+
+def test_orientation_string_and_code_are_the_same_wall():
+    assert Wall(2, 3, "horizontal") == Wall(2, 3, HORIZONTAL)
+    assert hash(Wall(2, 3, "vertical")) == hash(Wall(2, 3, VERTICAL))
+    assert Wall(2, 3, VERTICAL).orientation == "vertical"
+    assert Wall(2, 3, "horizontal") != Wall(2, 3, "vertical")
+
+def test_wall_is_immutable():
+    wall = Wall(1, 1, "horizontal")
+    with pytest.raises(AttributeError):
+        wall.row = 2
+    with pytest.raises(AttributeError):
+        wall.colour = 2
+
+def test_wall_slot_matches_tables():
+    for slot, wall in enumerate(SLOT_WALLS):
+        assert wall.slot == slot == wall_slot(wall.row, wall.col, wall.orientation)
+    assert Wall(ROWS - 1, 0, "horizontal").slot is None
+    assert Wall(0, COLS - 1, "vertical").slot is None
+
+def test_wall_pickles():
+    wall = Wall(4, 5, "vertical")
+    copy = pickle.loads(pickle.dumps(wall))
+
+    assert copy == wall and copy.slot == wall.slot
+
+def test_move_is_a_tuple():
+    move = Move(3, 4)
+
+    assert move == (3, 4) and hash(move) == hash((3, 4))
+    assert (move.row, move.col) == (3, 4)
+
+def test_encode_decode_round_trip():
+    actions = [Move(row, col) for row in range(ROWS) for col in range(COLS)] + list(SLOT_WALLS)
+    codes = [encode_action(action) for action in actions]
+
+    assert codes == list(range(len(actions)))
+    assert [decode_action(code) for code in codes] == actions
+    assert encode_action((2, 2)) == encode_action(Move(2, 2))
@@ -0,0 +1,101 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from training import TrainingGame, TrainingAI
+from quoridor.constants import WHITE, BLACK
+from quoridor.search_stats import SearchStats
+
+
+class GameResult:
+    # Outcome of one headless game, agent 1 plays white and agent 2 plays black
+    # search_stats maps each color to the SearchStats of all its searches in the game added together
+    def __init__(self, game_id, seed, agent_1_weights, agent_2_weights, winner, plies, timed_out, duration, search_stats=None):
+        self.game_id = game_id
+        self.seed = seed
+        self.agent_1_weights = agent_1_weights
+        self.agent_2_weights = agent_2_weights
+        # WHITE, BLACK or None if the game did not finish
+        self.winner = winner
+        self.plies = plies
+        self.timed_out = timed_out
+        self.duration = duration
+        self.search_stats = search_stats if search_stats is not None else {}
+
+    def agent_1_won(self):
+        return self.winner == WHITE
+
+    def __repr__(self):
+        winner = {WHITE: "agent 1", BLACK: "agent 2"}.get(self.winner, "none")
+        return f"GameResult(game={self.game_id}, seed={self.seed}, winner={winner}, plies={self.plies}, timed_out={self.timed_out})"
+
+
+# Plays one game between two weighted agents as fast as possible, without a window or frame limiter
+# Games stop after timeout_seconds or max_plies (if given) without a winner
+# Both agents play moves from opening_book (an OpeningBook) while the game is still in it
+def play_game(game_id, agent_1_weights, agent_2_weights, seed, timeout_seconds=120, move_time_limit=None, max_plies=None,
+              opening_book=None):
+    # Seeding both generators makes a game with the same seed replay the same way,
+    # the caller's generator state is put back afterwards so running in process does not disturb it
+    random_state, numpy_state = random.getstate(), np.random.get_state()
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        return _play_seeded_game(game_id, agent_1_weights, agent_2_weights, seed, timeout_seconds, move_time_limit, max_plies,
+                                 opening_book)
+    finally:
+        random.setstate(random_state)
+        np.random.set_state(numpy_state)
+
+
+def _play_seeded_game(game_id, agent_1_weights, agent_2_weights, seed, timeout_seconds, move_time_limit, max_plies,
+                      opening_book):
+    game = TrainingGame(None, [agent_1_weights, agent_2_weights])
+    agents = {WHITE: TrainingAI(opening_book=opening_book), BLACK: TrainingAI(opening_book=opening_book)}
+
+    search_stats = {WHITE: SearchStats(), BLACK: SearchStats()}
+
+    start_time = time.perf_counter()
+    plies = 0
+    timed_out = False
+
+    while game.winner() is None:
+        if time.perf_counter() - start_time > timeout_seconds:
+            timed_out = True
+            break
+        if max_plies is not None and plies >= max_plies:
+            break
+
+        agent = agents[game.turn]
+        _, move = agent.search(game.get_board(), game.turn, time_limit=move_time_limit)
+        search_stats[game.turn].merge(agent.stats)
+        if move is None:
+            break
+        game.ai_move(move)
+        plies += 1
+
+    return GameResult(game_id, seed, agent_1_weights, agent_2_weights, game.winner(), plies, timed_out,
+                      time.perf_counter() - start_time, search_stats)
+
+
+def _play_game_job(job):
+    return play_game(*job)
+
+
+# Plays every (agent 1 weights, agent 2 weights) pairing, spreading the games across worker processes
+# Game i is seeded with base_seed + i, and results come back in the same order as the pairings
+def run_tournament(pairings, workers=None, base_seed=0, timeout_seconds=120, move_time_limit=None, max_plies=None,
+                   opening_book=None):
+    jobs = [
+        (game_id, agent_1_weights, agent_2_weights, base_seed + game_id, timeout_seconds, move_time_limit, max_plies,
+         opening_book)
+        for game_id, (agent_1_weights, agent_2_weights) in enumerate(pairings)
+    ]
+
+    if workers == 1:
+        return [_play_game_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_play_game_job, jobs))
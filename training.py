@@ -1,38 +1,110 @@
-from copy import deepcopy
+from collections import OrderedDict
 from quoridor.board import Board
+from quoridor.piece import Piece
 from quoridor.game import Game
-from quoridor.pathfinding import shortest_path
 from quoridor.ai import AI
 from quoridor.constants import BLACK, WHITE, ROWS
 
+class FeatureCache:
+    # Raw evaluation features per position key with least recently used eviction. Features do not depend
+    # on the weights, so positions reached again in any game (e.g. common openings) skip the path searches
+    def __init__(self, max_size=2 ** 16):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        features = self.entries.get(key)
+        if features is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return features
+
+    def put(self, key, features):
+        if self.max_size <= 0:
+            return
+        self.entries[key] = features
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# Used by every TrainingBoard that is not given its own cache, so all the games played in one process
+# (including the games a tournament worker plays one after another) share it
+shared_feature_cache = FeatureCache()
+
+
 class TrainingBoard(Board):
-    def __init__(self, weights):
+    EVAL_NOISE = 0
+
+    def __init__(self, weights, feature_cache=None):
         super().__init__()
         # Allows weights to be assigned to the evaluation function for training in machine_learning.py
         self.weights = weights
+        self.feature_cache = shared_feature_cache if feature_cache is None else feature_cache
 
-    def evaluate(self, color):
-        if color == WHITE:
-            path_weight_total, wall_weight, blockade_weight, forward_weight = self.weights[0]
-        else:
-            path_weight_total, wall_weight, blockade_weight, forward_weight = self.weights[1]
+    # Weights travel with the position so worker processes evaluate it the same way
+    def serialize(self):
+        return super().serialize(), self.weights
 
-        white_piece = self.get_piece_by_color(WHITE)
-        black_piece = self.get_piece_by_color(BLACK)
-        opponent_piece = white_piece if color == BLACK else black_piece
+    @classmethod
+    def deserialize(cls, data):
+        state, weights = data
+        board = cls(weights)
+        board.load_serialized(state)
+        return board
+
+    # White uses the first set of weights and black the second
+    def evaluation_weights(self, color):
+        return self.weights[0] if color == WHITE else self.weights[1]
 
-        white_shortest_path = shortest_path(self.horizontal_walls, self.vertical_walls, white_piece)
-        black_shortest_path = shortest_path(self.horizontal_walls, self.vertical_walls, black_piece)
- 
+    # There is no random term, so noise is ignored
+    def evaluate(self, color, noise=None):
         if self.winner() == color:
             return float(10000)  
-        if self.winner() == opponent_piece.color:
+        if self.winner() is not None:
             return float(-10000)  
 
+        # The key includes the side, since the features are from the point of view of color
+        key = self.zobrist_key(color)
+        features = self.feature_cache.get(key)
+        if features is None:
+            features = self.evaluation_features(color)
+            self.feature_cache.put(key, features)
+
+        path_diff, wall_bonus, blockade_bonus, forward_bonus = features
+        path_weight_total, wall_weight, blockade_weight, forward_weight = self.evaluation_weights(color)
+        eval_score = (path_weight_total * path_diff) + (wall_weight * wall_bonus) + (blockade_weight * blockade_bonus) + (forward_weight * forward_bonus)
+
+        return eval_score
+
+    # Path difference, wall bonus, blockade bonus and forward bonus for color, before weighting
+    def evaluation_features(self, color):
+        white_piece = self.get_piece_by_color(WHITE)
+        black_piece = self.get_piece_by_color(BLACK)
+        opponent_piece = white_piece if color == BLACK else black_piece
+
+        white_path_length = self.shortest_path_length(white_piece)
+        black_path_length = self.shortest_path_length(black_piece)
+
         if color == BLACK:
-            path_diff = (1.2 * len(white_shortest_path)) - (1.8 * len(black_shortest_path))
+            path_diff = (1.2 * white_path_length) - (1.8 * black_path_length)
         else:
-            path_diff = (1.2 * len(black_shortest_path)) - (1.8 * len(white_shortest_path))
+            path_diff = (1.2 * black_path_length) - (1.8 * white_path_length)
 
         wall_bonus = (self.white_walls - self.black_walls) if color == WHITE else (self.black_walls - self.white_walls)
 
@@ -49,9 +121,7 @@ class TrainingBoard(Board):
         else:
             forward_bonus = black_progress - white_progress  
 
-        eval_score = (path_weight_total * path_diff) + (wall_weight * wall_bonus) + (blockade_weight * blockade_bonus) + (forward_weight * forward_bonus)
-
-        return eval_score
+        return path_diff, wall_bonus, blockade_bonus, forward_bonus
     
 
 class TrainingGame(Game):
@@ -69,17 +139,21 @@ class TrainingGame(Game):
 class TrainingAI(AI):
     # Overrides partial_deepcopy to use the TrainingBoard class
     def partial_deepcopy(self, board):
-        new_board = TrainingBoard(board.weights)
+        new_board = TrainingBoard(board.weights, board.feature_cache)
 
-        new_board.board = [
-            [cell if isinstance(cell, int) else deepcopy(cell) for cell in row]
-            for row in board.board
-        ]
+        new_board.board = [row.copy() for row in board.board]
+        new_board.pieces = {}
+        for color, piece in board.pieces.items():
+            new_board.pieces[color] = new_board.board[piece.row][piece.col] = Piece(piece.row, piece.col, color)
+        new_board.winner_color = board.winner_color
         new_board.horizontal_walls = board.horizontal_walls.copy()
         new_board.vertical_walls = board.vertical_walls.copy()
+        new_board.blocked_edges = board.blocked_edges.copy()
         new_board.valid_walls = board.valid_walls.copy()
         new_board.white_walls = board.white_walls
         new_board.black_walls = board.black_walls
+        new_board.distance_maps = board.distance_maps.copy()
+        new_board.hash = board.hash
 
         return new_board
 